@@ -0,0 +1,120 @@
+import io
+import csv
+import json
+import zlib
+from datetime import date, datetime
+from sqlalchemy import select
+from models import User, SecurityLog, LoginAttempt, ContactMessage, CareerApplication
+
+
+# Tables that can be exported, with columns that must never leave the database
+EXPORTS = {
+    'users': (User, {'password_hash'}),
+    'security_logs': (SecurityLog, set()),
+    'login_attempts': (LoginAttempt, set()),
+    'contact_messages': (ContactMessage, set()),
+    'career_applications': (CareerApplication, set()),
+}
+FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+}
+
+# Spreadsheet apps treat cells starting with these as formulas
+_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _csv_cell(value):
+    value = _value(value)
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+class TableExporter:
+    """Streams a table as CSV or NDJSON without holding it in memory
+
+    Rows are read in ``chunk_size`` batches with ``WHERE id > :last ORDER
+    BY id LIMIT n``, each on a short-lived connection. That keeps memory
+    flat however big the table is, and unlike one long-running cursor it
+    doesn't hold a SQLite read lock that would stall writers for the whole
+    download. The header (or nothing, for NDJSON) is yielded before the
+    first query runs.
+    """
+
+    def __init__(self, engine, table, fmt='csv', chunk_size=1000, compress=False):
+        if table not in EXPORTS:
+            raise ValueError(f"Unknown export table '{table}'.")
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown export format '{fmt}'.")
+        model, excluded = EXPORTS[table]
+        self.engine = engine
+        self.table = table
+        self.format = fmt
+        self.chunk_size = chunk_size
+        self.compress = compress
+        self.columns = [column for column in model.__table__.columns if column.name not in excluded]
+        self.key = model.__table__.c.id
+
+    @property
+    def mimetype(self):
+        return 'application/gzip' if self.compress else FORMATS[self.format][0]
+
+    def filename(self, today=None):
+        """Download name such as users-20240131.csv.gz"""
+        stamp = (today or date.today()).strftime('%Y%m%d')
+        return f"{self.table}-{stamp}.{FORMATS[self.format][1]}" + ('.gz' if self.compress else '')
+
+    def rows(self):
+        """Yield result rows one chunk at a time"""
+        last = None
+        while True:
+            query = select(*self.columns).order_by(self.key).limit(self.chunk_size)
+            if last is not None:
+                query = query.where(self.key > last)
+            with self.engine.connect() as connection:
+                chunk = connection.execute(query).all()
+            if not chunk:
+                return
+            yield chunk
+            last = chunk[-1].id
+            if len(chunk) < self.chunk_size:
+                return
+
+    def text_chunks(self):
+        """Yield the export as strings, one per chunk of rows"""
+        names = [column.name for column in self.columns]
+        buffer = io.StringIO()
+        if self.format == 'csv':
+            writer = csv.writer(buffer)
+            writer.writerow(names)
+            yield buffer.getvalue()
+            for chunk in self.rows():
+                buffer.seek(0)
+                buffer.truncate()
+                writer.writerows([_csv_cell(value) for value in row] for row in chunk)
+                yield buffer.getvalue()
+        else:
+            for chunk in self.rows():
+                yield ''.join(
+                    json.dumps(dict(zip(names, map(_value, row))), default=str) + '\n' for row in chunk
+                )
+
+    def __iter__(self):
+        if not self.compress:
+            for text in self.text_chunks():
+                yield text.encode()
+            return
+        # wbits=31 writes a gzip container; sync-flush each chunk so it leaves right away
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+        for text in self.text_chunks():
+            data = compressor.compress(text.encode()) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            if data:
+                yield data
+        yield compressor.flush()
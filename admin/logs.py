@@ -0,0 +1,64 @@
+from datetime import datetime
+from models import User, SecurityLog, LoginAttempt
+from pagination import Keyset
+
+
+SEVERITIES = ('info', 'warning', 'error', 'critical')
+
+
+def parse_time(value):
+    """Parse a datetime-local form value (naive UTC, like the log timestamps)"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def _time_range(query, column, start, end):
+    if start is not None:
+        query = query.filter(column >= start)
+    if end is not None:
+        query = query.filter(column < end)
+    return query
+
+
+def security_log_keyset(severity=None, event_type=None, ip_address=None, start=None, end=None):
+    """Keyset over security logs, newest first, narrowed by the viewer filters
+
+    Each equality filter has a (column, timestamp) index, so SQLite seeks
+    straight to the filtered rows in timestamp order; the rowid appended
+    to every index supplies the id tiebreak.
+    """
+    query = SecurityLog.query
+    if severity:
+        query = query.filter(SecurityLog.severity == severity)
+    if event_type:
+        query = query.filter(SecurityLog.event_type == event_type)
+    if ip_address:
+        query = query.filter(SecurityLog.ip_address == ip_address)
+    query = _time_range(query, SecurityLog.timestamp, start, end)
+    return Keyset(query, [SecurityLog.timestamp, SecurityLog.id], descending=True)
+
+
+def login_attempt_keyset(outcome=None, ip_address=None, start=None, end=None):
+    """Keyset over login attempts, newest first, narrowed by the viewer filters"""
+    query = LoginAttempt.query
+    if outcome == 'success':
+        query = query.filter(LoginAttempt.success.is_(True))
+    elif outcome == 'failed':
+        query = query.filter(LoginAttempt.success.is_(False))
+    if ip_address:
+        query = query.filter(LoginAttempt.ip_address == ip_address)
+    query = _time_range(query, LoginAttempt.timestamp, start, end)
+    return Keyset(query, [LoginAttempt.timestamp, LoginAttempt.id], descending=True)
+
+
+def usernames_for(entries):
+    """Map the user_ids on a page of log entries to usernames in one query"""
+    user_ids = {entry.user_id for entry in entries if entry.user_id}
+    if not user_ids:
+        return {}
+    rows = User.query.with_entities(User.id, User.username).filter(User.id.in_(user_ids))
+    return dict(rows.all())
@@ -1,8 +1,13 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash
+from flask import Blueprint, Response, abort, current_app, jsonify, render_template, request, redirect, url_for, flash
 from flask_login import login_required, current_user
 from functools import wraps
-from models import User
-from extensions import db
+from sqlalchemy import case, func
+from models import User, LoginAttempt, SecurityLog
+from extensions import db, sqlite_profile, user_cache, request_metrics, hourly_rollups
+from admin.search import user_search
+from admin.export import EXPORTS, FORMATS, TableExporter
+from admin.logs import SEVERITIES, login_attempt_keyset, parse_time, security_log_keyset, usernames_for
+from auth.middleware import log_security_event
 
 admin_bp = Blueprint('admin', __name__)
 
@@ -15,19 +20,65 @@ def admin_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+def user_stats():
+    """User counts for the dashboard cards in a single aggregate query"""
+    total, active, admins = db.session.query(
+        func.count(User.id),
+        func.coalesce(func.sum(case((User.is_active, 1), else_=0)), 0),
+        func.coalesce(func.sum(case((User.is_admin, 1), else_=0)), 0),
+    ).one()
+    return {
+        'total_users': total,
+        'active_users': active,
+        'admin_users': admins,
+        'suspended_users': total - active,
+    }
+
 @admin_bp.route('/dashboard')
 @login_required
 @admin_required
 def dashboard():
-    users = User.query.all()
-    return render_template('admin/dashboard.html', users=users)
+    hourly_rollups.update(max_batches=current_app.config.get('ROLLUP_DASHBOARD_BATCHES', 4))
+    logins = hourly_rollups.totals(('logins', 'failed_logins'), hours=24)
+
+    return render_template(
+        'admin/dashboard.html',
+        **user_stats(),
+        successful_logins_24h=logins['logins'],
+        failed_logins_24h=logins['failed_logins'],
+        recent_logins=LoginAttempt.query.order_by(LoginAttempt.id.desc()).limit(10).all(),
+        recent_events=SecurityLog.query.order_by(SecurityLog.id.desc()).limit(10).all(),
+    )
+
+@admin_bp.route('/activity')
+@login_required
+@admin_required
+def activity():
+    """Chart data from the hourly rollups: hourly points up to a week, daily beyond"""
+    days = min(max(request.args.get('days', 30, type=int), 1), 365)
+    hourly_rollups.update(max_batches=current_app.config.get('ROLLUP_DASHBOARD_BATCHES', 4))
+    labels, series = hourly_rollups.series(days=days, daily=days > 7)
+    return jsonify(days=days, labels=labels, series=series)
 
 @admin_bp.route('/users')
 @login_required
 @admin_required
 def users():
-    users = User.query.all()
-    return render_template('admin/users.html', users=users)
+    per_page = min(request.args.get('per_page', current_app.config.get('ADMIN_USERS_PER_PAGE', 25), type=int), 100)
+    filters = {
+        'search': request.args.get('search', '').strip(),
+        'status': request.args.get('status', ''),
+        'role': request.args.get('role', ''),
+    }
+    users = user_search(filters['search'], filters['status'], filters['role']).paginate(
+        page=request.args.get('page', 1, type=int),
+        per_page=max(per_page, 1),
+        after=request.args.get('after'),
+        before=request.args.get('before'),
+        args=filters,
+        count_limit=current_app.config.get('ADMIN_SEARCH_COUNT_LIMIT', 1000) if any(filters.values()) else None,
+    )
+    return render_template('admin/users.html', users=users, **filters)
 
 @admin_bp.route('/user/<int:user_id>')
 @login_required
@@ -44,6 +95,7 @@ def toggle_user_status(user_id):
     if user.id != current_user.id:
         user.is_active = not user.is_active
         db.session.commit()
+        user_cache.invalidate(user.id)
         flash(f'User {user.username} status updated.', 'success')
     return redirect(url_for('admin.users'))
 
@@ -55,5 +107,88 @@ def toggle_user_admin(user_id):
     if user.id != current_user.id:
         user.is_admin = not user.is_admin
         db.session.commit()
+        user_cache.invalidate(user.id)
         flash(f'User {user.username} admin privileges updated.', 'success')
     return redirect(url_for('admin.users'))
+
+@admin_bp.route('/metrics')
+@login_required
+@admin_required
+def metrics():
+    return Response(request_metrics.render(), mimetype='text/plain; version=0.0.4')
+
+def log_page(keyset, filters):
+    """Page of a log keyset using the current request's page and cursor args"""
+    return keyset.paginate(
+        page=request.args.get('page', 1, type=int),
+        per_page=current_app.config.get('ADMIN_LOGS_PER_PAGE', 50),
+        after=request.args.get('after'),
+        before=request.args.get('before'),
+        args=filters,
+        count_limit=current_app.config.get('ADMIN_LOGS_COUNT_LIMIT', 10000),
+    )
+
+@admin_bp.route('/security')
+@login_required
+@admin_required
+def security():
+    filters = {
+        'severity': request.args.get('severity', ''),
+        'event_type': request.args.get('event_type', '').strip(),
+        'ip_address': request.args.get('ip_address', '').strip(),
+        'start': request.args.get('start', ''),
+        'end': request.args.get('end', ''),
+    }
+    entries = log_page(security_log_keyset(
+        filters['severity'], filters['event_type'], filters['ip_address'],
+        parse_time(filters['start']), parse_time(filters['end']),
+    ), filters)
+    return render_template(
+        'admin/logs.html', kind='security', entries=entries, filters=filters,
+        severities=SEVERITIES, usernames=usernames_for(entries.items),
+    )
+
+@admin_bp.route('/logs')
+@login_required
+@admin_required
+def logs():
+    filters = {
+        'outcome': request.args.get('outcome', ''),
+        'ip_address': request.args.get('ip_address', '').strip(),
+        'start': request.args.get('start', ''),
+        'end': request.args.get('end', ''),
+    }
+    entries = log_page(login_attempt_keyset(
+        filters['outcome'], filters['ip_address'],
+        parse_time(filters['start']), parse_time(filters['end']),
+    ), filters)
+    return render_template('admin/logs.html', kind='logins', entries=entries, filters=filters)
+
+def export_response(table):
+    """Stream table as a CSV or NDJSON download, gzipped with ?gzip=1"""
+    fmt = request.args.get('format', 'csv')
+    if table not in EXPORTS or fmt not in FORMATS:
+        abort(404)
+    model = EXPORTS[table][0]
+    exporter = TableExporter(
+        sqlite_profile.read_engine(getattr(model, '__bind_key__', None)), table, fmt,
+        chunk_size=current_app.config.get('EXPORT_CHUNK_SIZE', 1000),
+        compress=request.args.get('gzip') in ('1', 'true'),
+    )
+    log_security_event('data_export', f'{current_user.username} exported {table} as {fmt}', user_id=current_user.id)
+    return Response(exporter, mimetype=exporter.mimetype, headers={
+        'Content-Disposition': f'attachment; filename={exporter.filename()}',
+        'X-Accel-Buffering': 'no',
+    })
+
+@admin_bp.route('/export/<table>')
+@login_required
+@admin_required
+def export(table):
+    return export_response(table)
+
+@admin_bp.route('/export_users')
+@login_required
+@admin_required
+def export_users():
+    return export_response('users')
@@ -0,0 +1,75 @@
+import threading
+from sqlalchemy import Integer, and_, column, inspect, or_, table
+from extensions import db
+from models import User
+from pagination import Keyset
+
+
+# The trigram tokenizer can only match terms of at least three characters
+MIN_FTS_TERM = 3
+
+# External-content FTS5 index over users.username and users.email, see the migration
+users_fts = table('users_fts', column('rowid', Integer), column('users_fts'))
+
+# Whether each engine's database has users_fts, checked once per engine
+_fts_available = {}
+_fts_lock = threading.Lock()
+
+
+def _fts_phrase(term):
+    """Quote term as one FTS5 string so operators in it are matched literally"""
+    return '"' + term.replace('"', '""') + '"'
+
+
+def _has_users_fts():
+    """Whether users_fts exists; databases built before its migration fall back to LIKE"""
+    engine = db.engine
+    with _fts_lock:
+        if engine not in _fts_available:
+            _fts_available[engine] = inspect(engine).has_table('users_fts')
+        return _fts_available[engine]
+
+
+def user_search(term=None, status=None, role=None):
+    """Keyset over users matching a search term and status and role filters
+
+    Terms of three or more characters match anywhere in the username or
+    email through the ``users_fts`` trigram index. The query is then driven
+    from the index and paged on its rowid, so SQLite streams matches in id
+    order and stops once a page is full. Without the index (a database
+    that predates its migration) they fall back to a LIKE scan. Shorter
+    terms match as a prefix, compared with NOCASE like SQLite's LIKE.
+    """
+    term = (term or '').strip().lower()
+    query = User.query
+    key = User.id
+
+    if len(term) >= MIN_FTS_TERM and _has_users_fts():
+        query = query.join(users_fts, users_fts.c.rowid == User.id).filter(
+            users_fts.c.users_fts.match(_fts_phrase(term))
+        )
+        key = users_fts.c.rowid
+    elif len(term) >= MIN_FTS_TERM:
+        query = query.filter(or_(
+            User.username.contains(term, autoescape=True),
+            User.email.contains(term, autoescape=True),
+        ))
+    elif term:
+        upper = term[:-1] + chr(ord(term[-1]) + 1)
+        username, email = User.username.collate('NOCASE'), User.email.collate('NOCASE')
+        query = query.filter(or_(
+            and_(username >= term, username < upper),
+            and_(email >= term, email < upper),
+        ))
+
+    if status == 'active':
+        query = query.filter(User.is_active.is_(True))
+    elif status == 'suspended':
+        query = query.filter(User.is_active.is_(False))
+
+    if role == 'admin':
+        query = query.filter(User.is_admin.is_(True))
+    elif role == 'user':
+        query = query.filter(User.is_admin.is_(False))
+
+    return Keyset(query, [key], key=lambda user: (user.id,))
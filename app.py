@@ -1,34 +1,62 @@
 # app.py
+import click
 from flask import Flask, redirect
-from extensions import db, login_manager
-from flask_migrate import Migrate
+from extensions import db, sqlite_profile, login_manager, password_hasher, user_cache, audit_sink, rate_limiter, rolling_counters, ip_access_list, request_metrics, query_profiler, hourly_rollups, event_cache, image_pipeline, static_assets, page_cache, template_cache
+from auth.scanner import request_scanner
 from models import User   # also import Event if you need it in app.py
+from config import config
 import os
 
-def create_app():
+def create_app(config_name=None):
     app = Flask(__name__)
     
-    # Basic configuration
-    app.config['SECRET_KEY'] = 'your-secret-key-here'
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///aura.db'
-    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    # Configuration: FLASK_CONFIG picks development, production or testing
+    app.config.from_object(config[config_name or os.environ.get('FLASK_CONFIG', 'default')])
+    if not app.config.get('SECRET_KEY'):
+        # ProductionConfig reads SECRET_KEY from the environment and has no fallback
+        raise RuntimeError("SECRET_KEY is not set; export SECRET_KEY before starting the app.")
     
-    # Initialize extensions
+    # Initialize extensions; the SQLite profile sets engine options, so it goes first
+    sqlite_profile.init_app(app)
     db.init_app(app)
     login_manager.init_app(app)
     login_manager.login_view = 'auth.login'
+    password_hasher.init_app(app)
+    user_cache.init_app(app)
+    audit_sink.init_app(app)
+    # The blocklist hook must run before rate limiting counts the request
+    ip_access_list.init_app(app)
+    request_scanner.init_app(app)
+    rate_limiter.init_app(app)
+    rolling_counters.init_app(app)
+    request_metrics.init_app(app)
+    query_profiler.init_app(app)
+    hourly_rollups.init_app(app)
+    event_cache.init_app(app)
+    image_pipeline.init_app(app)
+    static_assets.init_app(app)
+    page_cache.init_app(app)
+    template_cache.init_app(app)
     
-    # Flask-Migrate initialization
-    migrate = Migrate(app, db)
+    # Flask-Migrate pulls in Alembic and Mako (~150 ms of imports); it and the
+    # static exporter only back flask CLI commands (flask db ..., flask
+    # export-static), so gunicorn workers skip them
+    if click.get_current_context(silent=True) is not None:
+        from flask_migrate import Migrate
+        from web.static_site import StaticSite
+        Migrate(app, db)
+        StaticSite(app)
 
     # Register blueprints
     from main.routes import bp as main_bp
     from auth.routes import auth_bp
     from admin.routes import admin_bp
+    from events.routes import bp as events_bp
     
     app.register_blueprint(main_bp)
     app.register_blueprint(auth_bp, url_prefix="/auth")
     app.register_blueprint(admin_bp, url_prefix="/admin")
+    app.register_blueprint(events_bp, url_prefix="/events")
     
     @app.route('/login')
     def login_redirect():
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Script to archive old security logs and login attempts and search the archive
+"""
+
+import argparse
+import json
+from datetime import datetime
+from app import create_app
+from models import SecurityLog, LoginAttempt
+from auth.retention import LogArchiver, ArchiveReader, ARCHIVED_MODELS
+from auth.rollups import HourlyRollups
+
+
+def run(app, args):
+    """Archive rows past the retention window, then reclaim the freed pages"""
+    archiver = LogArchiver(app)
+    if args.days is not None:
+        archiver.retention_days = args.days
+    if args.batch_size is not None:
+        archiver.batch_size = args.batch_size
+    cutoff = archiver.cutoff()
+
+    print("🗄️  Aura Log Archival")
+    print("=" * 40)
+    print(f"Archiving rows older than {cutoff:%Y-%m-%d %H:%M} UTC into {archiver.archive_dir}\n")
+
+    if not args.dry_run:
+        # Archived rows leave the database, so count them into the chart rollups first
+        covered = HourlyRollups(app).update()
+        print(f"   📈 {'rollups':<16} {covered:>10} new ids counted")
+
+    for model in (SecurityLog, LoginAttempt):
+        count = archiver.archive(model, cutoff, dry_run=args.dry_run)
+        verb = "due" if args.dry_run else "archived"
+        print(f"   📦 {model.__tablename__:<16} {count:>10} rows {verb}")
+
+    if args.dry_run:
+        return
+
+    if args.enable_incremental_vacuum:
+        print("\n🔧 Switching to incremental auto_vacuum (full VACUUM, locks the database)...")
+        archiver.enable_incremental_vacuum()
+
+    result = archiver.vacuum(args.vacuum_pages)
+    if result is None:
+        print("\n⚠️  Database is not in incremental auto_vacuum mode; freed pages stay in the file.")
+        print("   Run once with --enable-incremental-vacuum during a quiet period.")
+    else:
+        print(f"\n🧹 Incremental vacuum: {result[0]} free pages -> {result[1]}")
+
+
+def search(app, args):
+    """Print archived rows matching the filters as NDJSON"""
+    archiver = LogArchiver(app)
+    reader = ArchiveReader(archiver.archive_dir)
+    filters = {}
+    if args.ip:
+        filters['ip_address'] = args.ip
+    if args.event_type:
+        filters['event_type'] = args.event_type
+    if args.email:
+        filters['email'] = args.email
+    start = datetime.fromisoformat(args.start) if args.start else None
+    end = datetime.fromisoformat(args.end) if args.end else None
+
+    shown = 0
+    for row in reader.query(args.table, start, end, **filters):
+        print(json.dumps(row))
+        shown += 1
+        if args.limit and shown >= args.limit:
+            break
+
+
+def main():
+    """Archive old log rows or search the archive"""
+    parser = argparse.ArgumentParser(description='Archive and search security logs')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='archive rows past the retention window')
+    run_parser.add_argument('--days', type=int,
+                            help='retention window in days (default: LOG_RETENTION_DAYS, 90)')
+    run_parser.add_argument('--batch-size', type=int,
+                            help='rows archived and deleted per transaction (default: 1000)')
+    run_parser.add_argument('--vacuum-pages', type=int,
+                            help='free pages to release per run (default: all)')
+    run_parser.add_argument('--enable-incremental-vacuum', action='store_true',
+                            help='switch the database to incremental auto_vacuum first (one full VACUUM)')
+    run_parser.add_argument('--dry-run', action='store_true',
+                            help='count the rows that are due without archiving them')
+
+    search_parser = commands.add_parser('search', help='search archived partitions')
+    search_parser.add_argument('table', choices=ARCHIVED_MODELS)
+    search_parser.add_argument('--start', help='earliest timestamp, e.g. 2024-01-31T00:00')
+    search_parser.add_argument('--end', help='timestamp to stop before')
+    search_parser.add_argument('--ip', help='exact IP address')
+    search_parser.add_argument('--event-type', help='exact event type (security_logs)')
+    search_parser.add_argument('--email', help='exact email (login_attempts)')
+    search_parser.add_argument('--limit', type=int, default=0, help='stop after this many rows')
+    args = parser.parse_args()
+
+    app = create_app()
+    if args.command == 'run':
+        run(app, args)
+    else:
+        search(app, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+import os
+import atexit
+import random
+import threading
+from collections import deque, defaultdict
+
+
+OVERFLOW_POLICIES = ('drop_oldest', 'sample')
+
+
+class AuditSink:
+    """Buffers SecurityLog and LoginAttempt rows and bulk-inserts them off the request path
+
+    Request handlers call ``record()``, which only appends to an in-memory
+    queue. A background thread per worker process writes the queue out in
+    batches, either when ``batch_size`` rows are waiting or every
+    ``flush_interval`` seconds, using one transaction per batch.
+
+    When the queue is full the overflow policy decides what is lost:
+    ``drop_oldest`` discards the oldest queued row, ``sample`` keeps only a
+    ``sample_rate`` fraction of new rows (each displacing the oldest) and
+    drops the rest.
+    """
+
+    def __init__(self, app=None, max_size=10000, batch_size=200, flush_interval=1.0,
+                 overflow_policy='drop_oldest', sample_rate=0.1):
+        self.app = None
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow_policy = overflow_policy
+        self.sample_rate = sample_rate
+        self._pid = None
+        self._thread = None
+        self._stopping = False
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._listeners = []
+        self._stats = {'enqueued': 0, 'flushed': 0, 'dropped': 0, 'failed': 0, 'batches': 0}
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Configure queue limits and flush policy from app config"""
+        self.app = app
+        self.max_size = app.config.get('AUDIT_QUEUE_SIZE', self.max_size)
+        self.batch_size = app.config.get('AUDIT_BATCH_SIZE', self.batch_size)
+        self.flush_interval = app.config.get('AUDIT_FLUSH_INTERVAL', self.flush_interval)
+        self.overflow_policy = app.config.get('AUDIT_OVERFLOW_POLICY', self.overflow_policy)
+        self.sample_rate = app.config.get('AUDIT_SAMPLE_RATE', self.sample_rate)
+        if self.overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown audit overflow policy '{self.overflow_policy}'.")
+        app.extensions['audit_sink'] = self
+        atexit.register(self.close)
+
+    def record(self, model, **values):
+        """Queue a row for model; returns False if the row was dropped"""
+        self._ensure_worker()
+        with self._cond:
+            if len(self._queue) >= self.max_size:
+                if self.overflow_policy == 'sample' and random.random() >= self.sample_rate:
+                    self._stats['dropped'] += 1
+                    return False
+                self._queue.popleft()
+                self._stats['dropped'] += 1
+            self._queue.append((model, values))
+            self._stats['enqueued'] += 1
+            if len(self._queue) >= self.batch_size:
+                self._cond.notify()
+        return True
+
+    def add_listener(self, listener):
+        """Call listener(connection, model, rows) inside each write transaction"""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def flush(self):
+        """Write everything queued so far on the calling thread"""
+        while True:
+            with self._cond:
+                batch = self._take(len(self._queue))
+            if not batch:
+                return
+            self._write(batch)
+
+    def close(self):
+        """Stop the background writer and flush what is left"""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        thread = self._thread
+        if thread is not None and self._pid == os.getpid():
+            thread.join(timeout=max(self.flush_interval, 1.0) * 5)
+        self.flush()
+
+    def stats(self):
+        """Return a snapshot of queue depth and row counters"""
+        with self._cond:
+            stats = dict(self._stats)
+            stats['queued'] = len(self._queue)
+        return stats
+
+    def _ensure_worker(self):
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._cond:
+            if self._pid == pid:
+                return
+            # After a fork the parent's rows belong to the parent
+            self._queue.clear()
+            self._stopping = False
+            self._pid = pid
+            self._thread = threading.Thread(target=self._run, name='audit-sink', daemon=True)
+            self._thread.start()
+
+    def _take(self, count):
+        count = min(count, len(self._queue))
+        return [self._queue.popleft() for _ in range(count)]
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._stopping or len(self._queue) >= self.batch_size,
+                    timeout=self.flush_interval,
+                )
+                if self._stopping:
+                    return
+                batch = self._take(self.batch_size)
+            if batch:
+                self._write(batch)
+
+    def _write(self, batch):
+        from extensions import sqlite_profile
+
+        # executemany needs identical keys per statement, so group on them
+        groups = defaultdict(list)
+        for model, values in batch:
+            groups[(model, tuple(sorted(values)))].append(values)
+
+        with self._write_lock, self.app.app_context():
+            try:
+                with sqlite_profile.write_engine('audit').begin() as connection:
+                    for (model, _), rows in groups.items():
+                        connection.execute(model.__table__.insert(), rows)
+                        self._notify(connection, model, rows)
+                written, failed = len(batch), 0
+            except Exception as e:
+                # Retry row by row so one bad row doesn't lose the whole batch
+                self.app.logger.warning(f"Audit batch of {len(batch)} rows failed, retrying per row: {e}")
+                written, failed = self._write_rows(sqlite_profile.write_engine('audit'), batch)
+
+        with self._cond:
+            self._stats['flushed'] += written
+            self._stats['failed'] += failed
+            self._stats['batches'] += 1
+
+    def _write_rows(self, engine, batch):
+        written = failed = 0
+        for model, values in batch:
+            try:
+                with engine.begin() as connection:
+                    connection.execute(model.__table__.insert(), values)
+                    self._notify(connection, model, [values])
+                written += 1
+            except Exception as e:
+                failed += 1
+                self.app.logger.error(f"Failed to write {model.__tablename__} audit row: {e}")
+        return written, failed
+
+    def _notify(self, connection, model, rows):
+        for listener in self._listeners:
+            listener(connection, model, rows)
@@ -0,0 +1,101 @@
+import time
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+from sqlalchemy import text, bindparam
+
+
+_UPSERT = text(
+    "INSERT INTO event_counters (ip_address, action, bucket, count) "
+    "VALUES (:ip_address, :action, :bucket, :count) "
+    "ON CONFLICT (ip_address, action, bucket) DO UPDATE SET count = event_counters.count + excluded.count"
+)
+_SUM = text(
+    "SELECT COALESCE(SUM(count), 0) FROM event_counters "
+    "WHERE ip_address = :ip_address AND action IN :actions AND bucket >= :first_bucket"
+).bindparams(bindparam('actions', expanding=True))
+_PRUNE = text("DELETE FROM event_counters WHERE bucket < :first_bucket")
+
+
+def action_for(model, row):
+    """Counter action for an audit row: the table name, plus event_type for security logs"""
+    if model.__tablename__ == 'security_logs':
+        return f"security_logs:{row.get('event_type')}"
+    return model.__tablename__
+
+
+class RollingCounters:
+    """Per-IP, per-action event counts in fixed time buckets
+
+    The counters are bumped in the same transaction that the audit sink uses
+    to insert SecurityLog and LoginAttempt rows. Rate checks then sum the
+    handful of buckets inside their window, instead of running COUNT(*)
+    over a table that keeps growing. Buckets older than ``retention``
+    seconds are pruned as new ones are written.
+
+    Windows are rounded out to whole buckets, so a check may include up to
+    one extra bucket of events from just before the window.
+    """
+
+    def __init__(self, app=None, bucket_seconds=60, retention=86400):
+        self.bucket_seconds = bucket_seconds
+        self.retention = retention
+        self._last_prune = 0.0
+        self._lock = threading.Lock()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Configure bucket size and retention and subscribe to the audit sink"""
+        from extensions import audit_sink
+
+        self.bucket_seconds = app.config.get('EVENT_COUNTER_BUCKET_SECONDS', self.bucket_seconds)
+        self.retention = app.config.get('EVENT_COUNTER_RETENTION', self.retention)
+        audit_sink.add_listener(self.record_rows)
+        app.extensions['rolling_counters'] = self
+
+    def bucket_for(self, timestamp):
+        """Bucket number for a naive-UTC or aware datetime"""
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        return int(timestamp.timestamp() // self.bucket_seconds)
+
+    def record_rows(self, connection, model, rows):
+        """Audit sink listener: add rows to their (ip, action, bucket) counters"""
+        increments = Counter()
+        now = datetime.now(timezone.utc)
+        for row in rows:
+            ip_address = row.get('ip_address')
+            if not ip_address:
+                continue
+            bucket = self.bucket_for(row.get('timestamp') or now)
+            increments[(ip_address, action_for(model, row), bucket)] += 1
+        if increments:
+            connection.execute(_UPSERT, [
+                {'ip_address': ip, 'action': action, 'bucket': bucket, 'count': count}
+                for (ip, action, bucket), count in increments.items()
+            ])
+        self._maybe_prune(connection)
+
+    def count(self, ip_address, actions, window_seconds, session=None):
+        """Events for ip_address across actions within the last window_seconds"""
+        from extensions import db
+        from models import EventCounter
+
+        session = session or db.session
+        first_bucket = int((time.time() - window_seconds) // self.bucket_seconds)
+        if isinstance(actions, str):
+            actions = [actions]
+        return session.execute(
+            _SUM, {'ip_address': ip_address, 'actions': list(actions), 'first_bucket': first_bucket},
+            bind_arguments={'mapper': EventCounter},
+        ).scalar()
+
+    def _maybe_prune(self, connection):
+        now = time.time()
+        with self._lock:
+            if now - self._last_prune < self.bucket_seconds:
+                return
+            self._last_prune = now
+        connection.execute(_PRUNE, {'first_bucket': int((now - self.retention) // self.bucket_seconds)})
@@ -0,0 +1,348 @@
+import os
+import time
+import random
+import sqlite3
+import threading
+from flask import current_app
+from flask_sqlalchemy.session import Session as FlaskSession
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.sql.elements import TextClause
+
+
+DEFAULT_PRAGMAS = {
+    'busy_timeout': 5000,  # Milliseconds; applied first so the others can wait for locks
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 268435456,  # 256 MiB
+    'cache_size': -65536,  # Negative means KiB: 64 MiB per connection
+    'temp_store': 'MEMORY',
+}
+# Persistent or write-only settings a read-only connection can't change
+_WRITER_ONLY_PRAGMAS = ('journal_mode',)
+
+_WRITING = 'sqlite_profile_writing'
+
+
+class _RetryingCursor(sqlite3.Cursor):
+    """Retries a statement that failed with SQLITE_BUSY while opening its transaction"""
+
+    def execute(self, sql, parameters=()):
+        return self.connection.retry_busy(super().execute, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        # Materialized so a retry sees the same rows
+        return self.connection.retry_busy(super().executemany, sql, list(seq_of_parameters))
+
+
+class ProfiledConnection(sqlite3.Connection):
+    """sqlite3 connection that applies ``pragmas`` on open and retries busy writes
+
+    Writers use ``BEGIN IMMEDIATE``, so a transaction takes SQLite's write
+    lock before its first statement instead of upgrading a read lock
+    halfway through, which is what turns contention into an immediate
+    ``database is locked``. When the lock still can't be had within
+    ``busy_timeout``, the statement that would have opened the transaction
+    is retried up to ``retries`` times with jittered exponential backoff.
+    Nothing has run yet at that point, so the retry is always safe.
+
+    Subclasses built by ``connection_class`` carry the settings, because
+    ``sqlite3.connect`` doesn't pass extra arguments to the factory.
+    """
+
+    pragmas = DEFAULT_PRAGMAS
+    begin = 'IMMEDIATE'
+    retries = 5
+    backoff = 0.05
+    checkpoint_interval = None
+
+    def __init__(self, database, *args, **kwargs):
+        super().__init__(database, *args, **kwargs)
+        cursor = self.cursor()
+        for name, value in self.pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+        cursor.close()
+        if self.checkpoint_interval:
+            WalCheckpointer.ensure(database, self.checkpoint_interval)
+
+    def cursor(self, factory=_RetryingCursor):
+        return super().cursor(factory)
+
+    @property
+    def isolation_level(self):
+        return sqlite3.Connection.isolation_level.__get__(self)
+
+    @isolation_level.setter
+    def isolation_level(self, value):
+        # SQLAlchemy resets connections to '' (a deferred BEGIN) after AUTOCOMMIT use
+        sqlite3.Connection.isolation_level.__set__(self, self.begin if value == '' else value)
+
+    def retry_busy(self, method, *args):
+        attempt = 0
+        while True:
+            opening = not self.in_transaction
+            try:
+                return method(*args)
+            except sqlite3.OperationalError as e:
+                busy = getattr(e, 'sqlite_errorcode', sqlite3.SQLITE_BUSY) & 0xff == sqlite3.SQLITE_BUSY
+                if not (busy and opening and not self.in_transaction) or attempt >= self.retries:
+                    raise
+            time.sleep(self.backoff * (2 ** attempt) * (0.5 + random.random()))
+            attempt += 1
+
+
+class WalCheckpointer:
+    """Background WAL checkpoints for a database, one thread per process and file
+
+    With ``checkpoint_interval`` set, writers turn off SQLite's automatic
+    checkpoint (which runs inside whichever commit crosses
+    ``wal_autocheckpoint`` pages) and this thread runs a PASSIVE checkpoint
+    every ``interval`` seconds on its own connection instead. PASSIVE never
+    waits for readers or writers; pages it couldn't copy go next time.
+    """
+
+    _threads = {}
+    _lock = threading.Lock()
+
+    def __init__(self, path, interval):
+        self.path = path
+        self.interval = interval
+        self.last = None
+
+    @classmethod
+    def ensure(cls, path, interval):
+        key = (os.getpid(), path)
+        if key in cls._threads:
+            return
+        with cls._lock:
+            if key in cls._threads:
+                return
+            checkpointer = cls(path, interval)
+            cls._threads[key] = checkpointer
+            threading.Thread(target=checkpointer.run, name='wal-checkpoint', daemon=True).start()
+
+    def run(self):
+        connection = sqlite3.connect(self.path, timeout=1, check_same_thread=False)
+        while True:
+            time.sleep(self.interval)
+            try:
+                # (busy, wal pages, pages checkpointed)
+                self.last = connection.execute('PRAGMA wal_checkpoint(PASSIVE)').fetchone()
+            except sqlite3.Error:
+                continue
+
+
+def connection_class(pragmas=None, readonly=False, retries=5, backoff=0.05, checkpoint_interval=None):
+    """ProfiledConnection subclass with these settings, for ``connect_args['factory']``"""
+    pragmas = {**DEFAULT_PRAGMAS, **(pragmas or {})}
+    if readonly:
+        pragmas = {name: value for name, value in pragmas.items() if name not in _WRITER_ONLY_PRAGMAS}
+        pragmas['query_only'] = 1
+        checkpoint_interval = None
+    elif checkpoint_interval:
+        pragmas['wal_autocheckpoint'] = 0
+    return type('ProfiledConnection', (ProfiledConnection,), {
+        'pragmas': pragmas,
+        'begin': 'DEFERRED' if readonly else 'IMMEDIATE',
+        'retries': retries,
+        'backoff': backoff,
+        'checkpoint_interval': checkpoint_interval,
+    })
+
+
+def writer_options(pragmas=None, retries=5, backoff=0.05, timeout=30, checkpoint_interval=None):
+    """Engine options for the per-process writer: a single pooled connection
+
+    Threads queue for that connection in the pool for up to ``timeout``
+    seconds, so writes from one process reach SQLite one at a time and
+    only contend with the other processes.
+    """
+    factory = connection_class(pragmas, retries=retries, backoff=backoff, checkpoint_interval=checkpoint_interval)
+    return {
+        'poolclass': QueuePool,
+        'pool_size': 1,
+        'max_overflow': 0,
+        'pool_timeout': timeout,
+        'connect_args': {
+            'factory': factory,
+            'isolation_level': factory.begin,
+            'timeout': factory.pragmas['busy_timeout'] / 1000,
+            'check_same_thread': False,
+        },
+    }
+
+
+def reader_engine(path, pragmas=None, pool_size=5):
+    """Engine opening ``path`` read-only (``mode=ro``), for SELECTs"""
+    factory = connection_class(pragmas, readonly=True)
+    return create_engine(
+        f'sqlite:///file:{path}?mode=ro&uri=true',
+        pool_size=pool_size,
+        max_overflow=10,
+        connect_args={
+            'factory': factory,
+            'isolation_level': factory.begin,
+            'timeout': factory.pragmas['busy_timeout'] / 1000,
+            'check_same_thread': False,
+        },
+    )
+
+
+def _is_read(clause):
+    if getattr(clause, 'is_select', False):
+        return True
+    return isinstance(clause, TextClause) and clause.text.lstrip()[:6].upper() == 'SELECT'
+
+
+class RoutingSession(FlaskSession):
+    """Flask-SQLAlchemy session that sends plain reads to read-only engines
+
+    Each bind's writer is swapped for its reader, or for the main engine
+    when the bind shares the main database file. Once the session flushes
+    or runs a write, every statement goes to the writers until the
+    transaction ends, so reads inside a write transaction still see its
+    uncommitted changes.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        engine = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        if bind is not None:
+            return engine
+        profile = current_app.extensions.get('sqlite_profile')
+        if profile is None:
+            return engine
+        if self._flushing or (clause is not None and not _is_read(clause)):
+            self.info[_WRITING] = True
+        elif not self.info.get(_WRITING) and _is_read(clause):
+            return profile.readers.get(engine.url.database) or profile.canonical(engine)
+        return profile.canonical(engine)
+
+
+@event.listens_for(RoutingSession, 'after_transaction_end')
+def _end_write(session, transaction):
+    if transaction.parent is None:
+        session.info.pop(_WRITING, None)
+
+
+class SQLiteProfile:
+    """Production engine settings for file-backed SQLite databases
+
+    Every connection gets WAL, ``synchronous=NORMAL``, a busy timeout,
+    memory-mapped I/O and a larger page cache (``SQLITE_PRAGMAS`` overrides
+    any of them). Writes go through one connection per process and
+    database file, which threads queue for (see ``writer_options``).
+    Reads made through ``db.session`` use a separate pool of read-only
+    connections, which in WAL mode never wait for the writer.
+
+    The audit models (``__bind_key__ = 'audit'``) use the ``audit`` bind.
+    It points at the main database unless ``AUDIT_DATABASE_URI`` names
+    another file, which then gets its own write lock, WAL,
+    ``AUDIT_SQLITE_PRAGMAS`` and a background checkpoint every
+    ``AUDIT_CHECKPOINT_INTERVAL`` seconds. Audit bursts then never queue
+    behind, or hold up, registrations and admin changes. Sharing one file,
+    both binds use the main engine.
+
+    ``init_app`` has to run before ``db.init_app`` so the engine options
+    are in place when Flask-SQLAlchemy creates the engines. In-memory and
+    non-SQLite databases keep their defaults.
+    """
+
+    def __init__(self, app=None):
+        self.paths = {}
+        self.readers = {}
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Set engine options for the main and audit binds and create the read-only engines"""
+        app.extensions['sqlite_profile'] = self
+        binds = app.config.setdefault('SQLALCHEMY_BINDS', {})
+        binds.setdefault('audit', app.config.get('AUDIT_DATABASE_URI') or app.config.get('SQLALCHEMY_DATABASE_URI'))
+
+        main_pragmas = {**DEFAULT_PRAGMAS, **app.config.get('SQLITE_PRAGMAS', {})}
+        settings = {
+            None: (app.config.get('SQLALCHEMY_DATABASE_URI'), main_pragmas, None),
+            'audit': (
+                binds['audit'] if isinstance(binds['audit'], str) else binds['audit'].get('url'),
+                {**main_pragmas, **app.config.get('AUDIT_SQLITE_PRAGMAS', {})},
+                app.config.get('AUDIT_CHECKPOINT_INTERVAL', 30),
+            ),
+        }
+        self.paths = {key: self.database_path(app, uri) for key, (uri, _, _) in settings.items()}
+        if self.paths['audit'] is not None and self.paths['audit'] == self.paths[None]:
+            settings['audit'] = settings[None]
+
+        self.readers = {}
+        for key, (uri, pragmas, checkpoint_interval) in settings.items():
+            path = self.paths[key]
+            if path is None:
+                continue
+            options = writer_options(
+                pragmas,
+                retries=app.config.get('SQLITE_WRITE_RETRIES', 5),
+                backoff=app.config.get('SQLITE_WRITE_BACKOFF', 0.05),
+                timeout=app.config.get('SQLITE_WRITER_TIMEOUT', 30),
+                checkpoint_interval=checkpoint_interval,
+            )
+            if key is None:
+                configured = app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', {})
+            else:
+                configured = binds[key] if isinstance(binds[key], dict) else {'url': binds[key]}
+            connect_args = {**options.pop('connect_args'), **configured.get('connect_args', {})}
+            configured = {**options, **configured, 'connect_args': connect_args}
+            if key is None:
+                app.config['SQLALCHEMY_ENGINE_OPTIONS'] = configured
+            else:
+                binds[key] = configured
+
+            if app.config.get('SQLITE_READ_ONLY_CONNECTIONS', True) and path not in self.readers:
+                self.readers[path] = reader_engine(path, pragmas, app.config.get('SQLITE_READER_POOL_SIZE', 5))
+
+    def canonical(self, engine):
+        """The engine that writes to engine's database file: the main engine when a bind shares it"""
+        from extensions import db
+
+        if engine is not db.engine and self.paths.get(None) is not None and engine.url.database == db.engine.url.database:
+            return db.engine
+        return engine
+
+    def write_engine(self, bind_key=None):
+        """Engine for writes (and reads that must see them) on a bind"""
+        from extensions import db
+
+        return self.canonical(db.engines[bind_key])
+
+    def read_engine(self, bind_key=None):
+        """Engine for read-only work outside db.session: the bind's reader if enabled, else its writer"""
+        engine = self.write_engine(bind_key)
+        return self.readers.get(engine.url.database) or engine
+
+    def after_fork(self):
+        """Forget pooled connections inherited from the parent; call in each forked worker
+
+        ``close=False`` leaves the parent's sockets and file handles alone
+        and just gives this process fresh pools. Needs an app context.
+        """
+        from extensions import db
+
+        for engine in {*db.engines.values(), *self.readers.values()}:
+            engine.dispose(close=False)
+
+    @staticmethod
+    def database_path(app, uri):
+        """Absolute path of the SQLite database file at uri, or None if it isn't one"""
+        url = make_url(uri or 'sqlite://')
+        if url.drivername not in ('sqlite', 'sqlite+pysqlite'):
+            return None
+        database = url.database or ''
+        if url.query.get('uri'):
+            database = database[len('file:'):]
+        if database in ('', ':memory:'):
+            return None
+        # Flask-SQLAlchemy resolves relative paths against the instance folder
+        if not os.path.isabs(database):
+            os.makedirs(app.instance_path, exist_ok=True)
+            database = os.path.join(app.instance_path, database)
+        return database
@@ -2,6 +2,7 @@ from flask_wtf import FlaskForm
 from wtforms import StringField, PasswordField, BooleanField, SubmitField
 from wtforms.validators import DataRequired, Email, Length, EqualTo, ValidationError, Regexp
 from models import User
+from .scanner import field_scanner
 import re
 
 
@@ -19,22 +20,9 @@ class SecureLoginForm(FlaskForm):
     
     def validate_email(self, field):
         """Custom validation for email"""
-        if field.data:
-            # Check for suspicious patterns
-            suspicious_patterns = [
-                r'<script',
-                r'javascript:',
-                r'vbscript:',
-                r'onload=',
-                r'onerror=',
-                r'<iframe',
-                r'<object',
-                r'<embed'
-            ]
-            
-            for pattern in suspicious_patterns:
-                if re.search(pattern, field.data, re.IGNORECASE):
-                    raise ValidationError('Invalid email format detected')
+        # Check for suspicious patterns
+        if field_scanner.scan(field.data):
+            raise ValidationError('Invalid email format detected')
 
 
 class SecureRegisterForm(FlaskForm):
@@ -77,20 +65,8 @@ class SecureRegisterForm(FlaskForm):
             raise ValidationError('Email is already registered. Please use a different email or try logging in.')
         
         # Check for suspicious patterns
-        suspicious_patterns = [
-            r'<script',
-            r'javascript:',
-            r'vbscript:',
-            r'onload=',
-            r'onerror=',
-            r'<iframe',
-            r'<object',
-            r'<embed'
-        ]
-        
-        for pattern in suspicious_patterns:
-            if re.search(pattern, field.data, re.IGNORECASE):
-                raise ValidationError('Invalid email format detected')
+        if field_scanner.scan(field.data):
+            raise ValidationError('Invalid email format detected')
     
     def validate_password(self, field):
         """Enhanced password validation"""
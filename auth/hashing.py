@@ -0,0 +1,281 @@
+import os
+import json
+import time
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from werkzeug.security import generate_password_hash, check_password_hash, DEFAULT_PBKDF2_ITERATIONS
+
+try:
+    import bcrypt
+except ImportError:  # bcrypt is optional, pbkdf2 and scrypt always work
+    bcrypt = None
+
+
+DEFAULT_METHOD = 'pbkdf2:sha256:600000'
+DEFAULT_BCRYPT_ROUNDS = 12
+CALIBRATION_FILE = 'password_hashing.json'
+
+# Candidate parameters tried by calibrate(), cheapest first
+CALIBRATION_CANDIDATES = {
+    'pbkdf2': [f'pbkdf2:sha256:{n}' for n in (300000, 450000, 600000, 900000, 1200000)],
+    'bcrypt': [f'bcrypt:{n}' for n in (10, 11, 12, 13, 14)],
+}
+
+
+class HashingUnavailable(RuntimeError):
+    """Raised when the hashing pool is saturated or a hash call times out"""
+
+
+def normalize_method(method):
+    """Expand a hash method to the fully specified form stored in hashes"""
+    name, *args = method.split(':')
+    if name == 'pbkdf2':
+        hash_name = args[0] if args else 'sha256'
+        iterations = args[1] if len(args) > 1 else DEFAULT_PBKDF2_ITERATIONS
+        return f'pbkdf2:{hash_name}:{int(iterations)}'
+    if name == 'scrypt':
+        n, r, p = args if args else (2 ** 15, 8, 1)
+        return f'scrypt:{int(n)}:{int(r)}:{int(p)}'
+    if name == 'bcrypt':
+        return f'bcrypt:{int(args[0]) if args else DEFAULT_BCRYPT_ROUNDS}'
+    raise ValueError(f"Invalid hash method '{method}'.")
+
+
+def hash_method(pwhash):
+    """Return the normalized method a stored hash was created with"""
+    if pwhash.startswith('$2'):
+        return f'bcrypt:{int(pwhash.split("$")[2])}'
+    return pwhash.split('$', 1)[0]
+
+
+def generate_hash(password, method=DEFAULT_METHOD):
+    """Hash a password with a Werkzeug method or 'bcrypt:<rounds>'"""
+    if method.startswith('bcrypt'):
+        if bcrypt is None:
+            raise ValueError('bcrypt is not installed')
+        rounds = int(normalize_method(method).split(':')[1])
+        return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds)).decode()
+    return generate_password_hash(password, method)
+
+
+def verify_hash(pwhash, password):
+    """Check a password against a Werkzeug or bcrypt hash"""
+    if pwhash.startswith('$2'):
+        if bcrypt is None:
+            return False
+        return bcrypt.checkpw(password.encode(), pwhash.encode())
+    return check_password_hash(pwhash, password)
+
+
+def calibrate(target_ms, scheme='pbkdf2', samples=5):
+    """Benchmark verify latency and pick the strongest method within budget
+
+    Returns a dict with the chosen method and the measured median verify
+    time of every candidate. When no candidate fits the budget the cheapest
+    one is chosen and ``within_budget`` is False.
+    """
+    if scheme not in CALIBRATION_CANDIDATES:
+        raise ValueError(f"Unknown scheme '{scheme}'.")
+    if scheme == 'bcrypt' and bcrypt is None:
+        raise ValueError('bcrypt is not installed')
+
+    password = 'calibration-Passw0rd!'
+    measurements = []
+    for method in CALIBRATION_CANDIDATES[scheme]:
+        pwhash = generate_hash(password, method)
+        timings = []
+        for _ in range(samples):
+            start = time.perf_counter()
+            verify_hash(pwhash, password)
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        measurements.append({'method': method, 'verify_ms': round(timings[len(timings) // 2], 2)})
+
+    fitting = [m for m in measurements if m['verify_ms'] <= target_ms]
+    chosen = fitting[-1] if fitting else measurements[0]
+    return {
+        'method': chosen['method'],
+        'verify_ms': chosen['verify_ms'],
+        'target_ms': target_ms,
+        'within_budget': bool(fitting),
+        'measurements': measurements,
+    }
+
+
+def load_calibration(instance_path):
+    """Read a saved calibration result, or None if there isn't one"""
+    try:
+        with open(os.path.join(instance_path, CALIBRATION_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_calibration(instance_path, result):
+    """Persist a calibration result next to the database"""
+    os.makedirs(instance_path, exist_ok=True)
+    with open(os.path.join(instance_path, CALIBRATION_FILE), 'w') as f:
+        json.dump(result, f, indent=2)
+
+
+class PasswordHasher:
+    """Runs password hashing and verification in a bounded process pool
+
+    PBKDF2 at 600,000 iterations holds the GIL for hundreds of milliseconds,
+    so doing it on the request thread stalls every other request on the same
+    gunicorn worker. Work is sent to a fixed-size process pool instead, with a
+    cap on in-flight jobs so a login storm is rejected rather than queued
+    without bound. The cap is fixed when the first job is submitted. If a pool
+    process dies, the broken pool is replaced and the job is retried once.
+    """
+
+    def __init__(self, app=None, workers=None, max_pending=None, timeout=5.0, method=DEFAULT_METHOD):
+        self.method = normalize_method(method)
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.workers * 4
+        self.timeout = timeout
+        self._executor = None
+        self._executor_pid = None
+        self._lock = threading.Lock()
+        self._slots = None
+        self._stats = {
+            'submitted': 0,
+            'completed': 0,
+            'rejected': 0,
+            'timeouts': 0,
+            'pool_restarts': 0,
+            'queue_depth': 0,
+            'max_queue_depth': 0,
+            'total_ms': 0.0,
+            'max_ms': 0.0,
+        }
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Configure method, pool size, queue bound and timeout from app config"""
+        method = app.config.get('PASSWORD_HASH_METHOD')
+        if method:
+            self.method = normalize_method(method)
+        else:
+            self.use_calibration(app.instance_path)
+        self.workers = app.config.get('PASSWORD_HASH_WORKERS') or os.cpu_count() or 1
+        self.max_pending = app.config.get('PASSWORD_HASH_QUEUE_SIZE') or self.workers * 4
+        self.timeout = app.config.get('PASSWORD_HASH_TIMEOUT', self.timeout)
+        self.shutdown()
+        app.extensions['password_hasher'] = self
+
+    def use_calibration(self, instance_path):
+        """Switch to the method picked by the last calibration run, if any"""
+        calibration = load_calibration(instance_path)
+        if calibration and calibration.get('method'):
+            self.method = normalize_method(calibration['method'])
+
+    def hash(self, password, method=None):
+        """Hash a password off the request thread"""
+        return self._run(generate_hash, password, method or self.method)
+
+    def verify(self, pwhash, password):
+        """Check a password against a stored hash off the request thread"""
+        return self._run(verify_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        """Whether a stored hash was made with a different method than configured"""
+        try:
+            return hash_method(pwhash) != self.method
+        except (ValueError, IndexError):
+            return True
+
+    def stats(self):
+        """Return a snapshot of queue depth and latency counters"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats['avg_ms'] = stats['total_ms'] / stats['completed'] if stats['completed'] else 0.0
+        return stats
+
+    def shutdown(self, wait=False):
+        """Stop the worker processes owned by this process"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            owned = self._executor_pid == os.getpid()
+            self._executor_pid = None
+        if executor is not None and owned:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _get_executor(self):
+        """Create the pool lazily so each forked worker gets its own"""
+        pid = os.getpid()
+        with self._lock:
+            if self._executor is None or self._executor_pid != pid:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                self._executor_pid = pid
+            return self._executor
+
+    def _get_slots(self):
+        """Size the in-flight bound once, on first use, so no acquisition outlives its semaphore"""
+        with self._lock:
+            if self._slots is None:
+                self._slots = threading.BoundedSemaphore(self.max_pending)
+            return self._slots
+
+    def _discard_executor(self, executor):
+        """Drop a broken pool so the next job starts a new one"""
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = self._executor_pid = None
+            self._stats['pool_restarts'] += 1
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _release(self, slots, start):
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self._stats['queue_depth'] -= 1
+            self._stats['completed'] += 1
+            self._stats['total_ms'] += elapsed_ms
+            self._stats['max_ms'] = max(self._stats['max_ms'], elapsed_ms)
+        slots.release()
+
+    def _run(self, func, *args):
+        executor = self._get_executor()
+        try:
+            return self._submit(executor, func, args)
+        except BrokenProcessPool:
+            # A pool process died (e.g. OOM-killed), which breaks the whole pool
+            self._discard_executor(executor)
+            return self._submit(self._get_executor(), func, args)
+
+    def _submit(self, executor, func, args):
+        slots = self._get_slots()
+        if not slots.acquire(timeout=self.timeout):
+            with self._lock:
+                self._stats['rejected'] += 1
+            raise HashingUnavailable('Password hashing queue is full')
+
+        start = time.perf_counter()
+        with self._lock:
+            self._stats['submitted'] += 1
+            self._stats['queue_depth'] += 1
+            self._stats['max_queue_depth'] = max(
+                self._stats['max_queue_depth'], self._stats['queue_depth']
+            )
+
+        try:
+            future = executor.submit(func, *args)
+        except Exception:
+            self._release(slots, start)
+            raise
+
+        # The slot is held until the job really finishes, even if the caller
+        # gives up, so timed-out work still counts against the queue bound.
+        future.add_done_callback(lambda _: self._release(slots, start))
+
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            with self._lock:
+                self._stats['timeouts'] += 1
+            raise HashingUnavailable('Password hashing timed out')
@@ -0,0 +1,227 @@
+import os
+import time
+import socket
+import bisect
+import threading
+from array import array
+from flask import request
+
+
+def _parse_ip(ip_address):
+    """Return (version, int) for an address string, or None if it isn't one"""
+    try:
+        return 4, int.from_bytes(socket.inet_pton(socket.AF_INET, ip_address), 'big')
+    except (OSError, TypeError):
+        pass
+    try:
+        packed = socket.inet_pton(socket.AF_INET6, ip_address)
+    except (OSError, TypeError):
+        return None
+    # Treat IPv4-mapped IPv6 addresses (::ffff:a.b.c.d) as the IPv4 address
+    if packed[:12] == b'\0' * 10 + b'\xff\xff':
+        return 4, int.from_bytes(packed[12:], 'big')
+    return 6, int.from_bytes(packed, 'big')
+
+
+def _parse_range(entry):
+    """Return (version, start, end) for an address or CIDR range, or None if invalid"""
+    address, slash, prefix = entry.partition('/')
+    parsed = _parse_ip(address.strip())
+    if parsed is None:
+        return None
+    version, value = parsed
+    bits = 32 if version == 4 else 128
+    if slash:
+        prefix = prefix.strip()
+        if not prefix.isdigit():
+            return None
+        prefix = int(prefix)
+        if version == 4 and ':' in address:
+            # IPv4-mapped range written with an IPv6 prefix length
+            prefix -= 96
+        if not 0 <= prefix <= bits:
+            return None
+        host_bits = bits - prefix
+    else:
+        host_bits = 0
+    start = value >> host_bits << host_bits
+    return version, start, start | ((1 << host_bits) - 1)
+
+
+def _merge(ranges):
+    """Sort (start, end) ranges and merge overlapping or adjacent ones"""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return merged
+
+
+class IPRangeIndex:
+    """Set of IPv4 and IPv6 addresses and CIDR ranges with bisect lookups
+
+    Every entry becomes an integer (start, end) range. Ranges are merged and
+    kept as two sorted arrays per address family, so a lookup is a single
+    binary search no matter how many hundreds of thousands of ranges are
+    loaded, and IPv4 ranges take 8 bytes each.
+    """
+
+    def __init__(self, entries=()):
+        ranges = {4: [], 6: []}
+        self.invalid = []
+        for entry in entries:
+            entry = entry.split('#', 1)[0].strip()
+            if not entry:
+                continue
+            parsed = _parse_range(entry)
+            if parsed is None:
+                self.invalid.append(entry)
+                continue
+            version, start, end = parsed
+            ranges[version].append((start, end))
+
+        v4 = _merge(ranges[4])
+        v6 = _merge(ranges[6])
+        self._starts = {4: array('I', (r[0] for r in v4)), 6: [r[0] for r in v6]}
+        self._ends = {4: array('I', (r[1] for r in v4)), 6: [r[1] for r in v6]}
+
+    @classmethod
+    def from_file(cls, path):
+        """Load one address or CIDR range per line; '#' starts a comment"""
+        with open(path) as f:
+            return cls(f)
+
+    def __contains__(self, ip_address):
+        parsed = _parse_ip(ip_address)
+        if parsed is None:
+            return False
+        version, value = parsed
+        starts = self._starts[version]
+        index = bisect.bisect_right(starts, value) - 1
+        return index >= 0 and value <= self._ends[version][index]
+
+    def __len__(self):
+        return len(self._starts[4]) + len(self._starts[6])
+
+
+class IPAccessList:
+    """Blocklist and allowlist built from config and optional files, reloaded on change
+
+    Entries from ``BLOCKED_IPS``/``ALLOWED_IPS`` are combined with the files
+    at ``BLOCKED_IPS_FILE``/``ALLOWED_IPS_FILE``. File mtimes are checked
+    at most every ``IP_LIST_CHECK_INTERVAL`` seconds. When a file changes,
+    new indexes are built on a background thread and swapped in with one
+    assignment, so requests keep using the old lists until the new ones are
+    ready. An allowlisted address is never treated as blocked.
+
+    ``init_app`` installs a ``before_request`` hook that answers every
+    request from a blocked address with 403.
+    """
+
+    def __init__(self, app=None, check_interval=5.0):
+        self.check_interval = check_interval
+        self.blocked_entries = []
+        self.allowed_entries = []
+        self.blocked_file = None
+        self.allowed_file = None
+        self._indexes = (IPRangeIndex(), IPRangeIndex())
+        self._mtimes = (None, None)
+        self._next_check = 0.0
+        self._loading = False
+        self._lock = threading.Lock()
+        self.logger = None
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Read list entries and file paths from app config and build the indexes"""
+        self.blocked_entries = _config_list(app, 'BLOCKED_IPS')
+        self.allowed_entries = _config_list(app, 'ALLOWED_IPS')
+        self.blocked_file = app.config.get('BLOCKED_IPS_FILE') or os.path.join(app.instance_path, 'blocked_ips.txt')
+        self.allowed_file = app.config.get('ALLOWED_IPS_FILE') or os.path.join(app.instance_path, 'allowed_ips.txt')
+        self.check_interval = app.config.get('IP_LIST_CHECK_INTERVAL', self.check_interval)
+        self.logger = app.logger
+        self._reload(self._file_mtimes())
+        app.before_request(self._block_request)
+        app.extensions['ip_access_list'] = self
+
+    def _block_request(self):
+        """Reject a request from a blocked address with 403"""
+        if self.is_blocked(request.remote_addr):
+            from .middleware import log_security_event
+
+            log_security_event('request_blocked', 'IP address is blocked', 'warning')
+            return {'error': 'Request blocked for security reasons'}, 403
+        return None
+
+    def is_blocked(self, ip_address):
+        """Whether ip_address is in the blocklist and not in the allowlist"""
+        self._maybe_reload()
+        blocked, allowed = self._indexes
+        return ip_address in blocked and ip_address not in allowed
+
+    def is_allowed(self, ip_address):
+        """Whether ip_address is in the allowlist"""
+        self._maybe_reload()
+        return ip_address in self._indexes[1]
+
+    def _file_mtimes(self):
+        mtimes = []
+        for path in (self.blocked_file, self.allowed_file):
+            try:
+                mtimes.append(os.stat(path).st_mtime_ns)
+            except (OSError, TypeError):
+                mtimes.append(None)
+        return tuple(mtimes)
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        with self._lock:
+            if now < self._next_check or self._loading:
+                return
+            self._next_check = now + self.check_interval
+            mtimes = self._file_mtimes()
+            if mtimes == self._mtimes:
+                return
+            self._loading = True
+        threading.Thread(target=self._reload, args=(mtimes,), name='ip-list-reload', daemon=True).start()
+
+    def _reload(self, mtimes):
+        try:
+            indexes = (
+                self._build(self.blocked_entries, self.blocked_file, mtimes[0]),
+                self._build(self.allowed_entries, self.allowed_file, mtimes[1]),
+            )
+            self._indexes = indexes
+            self._mtimes = mtimes
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Failed to reload IP lists: {e}")
+        finally:
+            self._loading = False
+
+    def _build(self, entries, path, mtime):
+        lines = list(entries)
+        if mtime is not None:
+            with open(path) as f:
+                lines.extend(f)
+        index = IPRangeIndex(lines)
+        if index.invalid and self.logger:
+            self.logger.warning(f"Ignored {len(index.invalid)} invalid IP list entries, e.g. {index.invalid[0]!r}")
+        return index
+
+
+def _config_list(app, key):
+    """Config value as a list, falling back to the comma-separated environment variable"""
+    value = app.config.get(key)
+    if value is None:
+        value = os.environ.get(key, '')
+    if isinstance(value, str):
+        value = value.split(',')
+    return [entry.strip() for entry in value if entry and entry.strip()]
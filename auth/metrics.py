@@ -0,0 +1,295 @@
+import os
+import mmap
+import time
+import struct
+import threading
+from collections import defaultdict
+from flask import g, request
+
+try:
+    import fcntl
+except ImportError:  # Windows dev servers run a single process anyway
+    fcntl = None
+
+# Upper bounds in seconds; a final +Inf bucket catches everything slower
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+ENDPOINT_BYTES = 120
+
+# magic, bucket count, series count, dropped observations
+HEADER = struct.Struct('<4sIIQ')
+# endpoint, status code, request count, total seconds, per-bucket counts
+SLOT = struct.Struct(f'<{ENDPOINT_BYTES}sH6xQd{len(BUCKETS) + 1}Q')
+MAGIC = b'AMT1'
+UNMATCHED = 'none'
+# Totals of every worker that has exited, kept in the same layout as a worker file
+EXITED = 'exited.bin'
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _new_series():
+    return [0, 0.0, [0] * (len(BUCKETS) + 1)]
+
+
+def _exited_pid(name):
+    """The pid a '<pid>.bin' worker file belongs to if that process is gone, else None"""
+    stem, ext = os.path.splitext(name)
+    if ext != '.bin' or not stem.isdigit() or int(stem) == os.getpid():
+        return None
+    try:
+        os.kill(int(stem), 0)
+    except ProcessLookupError:
+        return int(stem)
+    except OSError:  # Exists but belongs to another user
+        pass
+    return None
+
+
+def _read_file(path, series):
+    """Add the series in one metrics file to series; returns its dropped count, or None if unreadable"""
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+    if len(data) < HEADER.size:
+        return None
+    magic, buckets, count, dropped = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or buckets != len(BUCKETS):
+        return None
+    for index in range(min(count, (len(data) - HEADER.size) // SLOT.size)):
+        endpoint, status, requests, seconds, *counts = SLOT.unpack_from(data, HEADER.size + index * SLOT.size)
+        entry = series[(endpoint.rstrip(b'\0'), status)]
+        entry[0] += requests
+        entry[1] += seconds
+        entry[2] = [a + b for a, b in zip(entry[2], counts)]
+    return dropped
+
+
+class RequestMetrics:
+    """Per-endpoint request counts, status codes and latency histograms
+
+    Each worker process writes its own memory-mapped file under
+    ``directory``, so recording a request needs no cross-process locking.
+    ``collect()`` sums the files of every worker and ``render()`` formats
+    the result for Prometheus. Files of workers that have exited are folded
+    into one ``exited.bin`` and deleted, so the counters never go backwards
+    and recycled workers don't leave a file each behind.
+
+    A series is one (endpoint, status code) pair. A worker records at most
+    ``max_series`` of them; anything beyond that is counted as dropped.
+    """
+
+    def __init__(self, app=None, directory=None, max_series=1024):
+        self.directory = directory
+        self.max_series = max_series
+        self._pid = None
+        self._fd = None
+        self._map = None
+        self._offsets = {}
+        self._lock = threading.Lock()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Configure the metrics directory and time every request"""
+        self.directory = app.config.get('METRICS_DIR') or os.path.join(app.instance_path, 'metrics')
+        self.max_series = app.config.get('METRICS_MAX_SERIES', self.max_series)
+        # First in line, so requests answered by another hook (a 403 block or a
+        # 429 rate limit) are timed too
+        app.before_request_funcs.setdefault(None, []).insert(0, self._start_timer)
+        app.after_request(self._record_response)
+        app.extensions['request_metrics'] = self
+
+    def observe(self, endpoint, status, seconds):
+        """Record one request to endpoint that returned status after seconds"""
+        key = ((endpoint or UNMATCHED).encode()[:ENDPOINT_BYTES], int(status))
+        bucket = len(BUCKETS)
+        for index, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                bucket = index
+                break
+
+        with self._lock:
+            view = self._open()
+            offset = self._offsets.get(key)
+            if offset is None:
+                offset = self._claim(view, key)
+                if offset is None:
+                    magic, buckets, series, dropped = HEADER.unpack_from(view, 0)
+                    HEADER.pack_into(view, 0, magic, buckets, series, dropped + 1)
+                    return
+            name, code, count, total, *counts = SLOT.unpack_from(view, offset)
+            counts[bucket] += 1
+            SLOT.pack_into(view, offset, name, code, count + 1, total + seconds, *counts)
+
+    def collect(self):
+        """Sum every worker file into {(endpoint, status): [count, seconds, bucket counts]}"""
+        self.merge_exited()
+        series = defaultdict(_new_series)
+        dropped = 0
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            names = []
+
+        for name in names:
+            if name.endswith('.bin'):
+                dropped += _read_file(os.path.join(self.directory, name), series) or 0
+        return {(endpoint.decode(errors='replace'), status): entry for (endpoint, status), entry in series.items()}, dropped
+
+    def merge_exited(self):
+        """Fold the files of exited workers into exited.bin and delete them; returns how many
+
+        Runs from ``collect()`` and from gunicorn's ``child_exit`` hook. A
+        lock file keeps two processes from merging the same file twice.
+        """
+        if self.directory is None:
+            return 0
+        try:
+            if not any(_exited_pid(name) for name in os.listdir(self.directory)):
+                return 0
+        except OSError:
+            return 0
+
+        fd = os.open(os.path.join(self.directory, 'merge.lock'), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            # Listed again under the lock, another process may have merged them already
+            paths = [os.path.join(self.directory, name) for name in os.listdir(self.directory) if _exited_pid(name)]
+            aggregate = os.path.join(self.directory, EXITED)
+            series = defaultdict(_new_series)
+            dropped = _read_file(aggregate, series) or 0
+            for path in paths:
+                dropped += _read_file(path, series) or 0
+
+            data = bytearray(HEADER.size + len(series) * SLOT.size)
+            HEADER.pack_into(data, 0, MAGIC, len(BUCKETS), len(series), dropped)
+            for index, ((endpoint, status), (count, seconds, counts)) in enumerate(series.items()):
+                SLOT.pack_into(data, HEADER.size + index * SLOT.size, endpoint, status, count, seconds, *counts)
+            with open(aggregate + '.tmp', 'wb') as f:
+                f.write(data)
+            os.replace(aggregate + '.tmp', aggregate)
+            for path in paths:
+                os.remove(path)
+            return len(paths)
+        finally:
+            os.close(fd)
+
+    def render(self):
+        """Current metrics in the Prometheus text exposition format"""
+        series, dropped = self.collect()
+        histograms = defaultdict(_new_series)
+        for (endpoint, _), (count, seconds, counts) in series.items():
+            entry = histograms[endpoint]
+            entry[0] += count
+            entry[1] += seconds
+            entry[2] = [a + b for a, b in zip(entry[2], counts)]
+
+        lines = [
+            '# HELP aura_request_duration_seconds Request latency by endpoint.',
+            '# TYPE aura_request_duration_seconds histogram',
+        ]
+        for endpoint, (count, seconds, counts) in sorted(histograms.items()):
+            label = _label(endpoint)
+            cumulative = 0
+            for bound, bucket_count in zip(BUCKETS + ('+Inf',), counts):
+                cumulative += bucket_count
+                lines.append(f'aura_request_duration_seconds_bucket{{endpoint="{label}",le="{bound}"}} {cumulative}')
+            lines.append(f'aura_request_duration_seconds_sum{{endpoint="{label}"}} {_number(seconds)}')
+            lines.append(f'aura_request_duration_seconds_count{{endpoint="{label}"}} {count}')
+
+        lines += [
+            '# HELP aura_requests_total Requests by endpoint and status code.',
+            '# TYPE aura_requests_total counter',
+        ]
+        for (endpoint, status), (count, _, _) in sorted(series.items()):
+            lines.append(f'aura_requests_total{{endpoint="{_label(endpoint)}",status="{status}"}} {count}')
+
+        lines += [
+            '# HELP aura_metrics_dropped_total Requests not recorded because a worker ran out of series.',
+            '# TYPE aura_metrics_dropped_total counter',
+            f'aura_metrics_dropped_total {dropped}',
+        ]
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        """Delete every worker file"""
+        with self._lock:
+            self._close()
+            try:
+                names = os.listdir(self.directory)
+            except OSError:
+                return
+            for name in names:
+                if name.endswith('.bin'):
+                    try:
+                        os.remove(os.path.join(self.directory, name))
+                    except OSError:
+                        pass
+
+    def _start_timer(self):
+        g.metrics_start = time.perf_counter()
+
+    def _record_response(self, response):
+        start = g.pop('metrics_start', None)
+        # Count the response even if the timer never started, as taking no time
+        elapsed = time.perf_counter() - start if start is not None else 0.0
+        self.observe(request.endpoint, response.status_code, elapsed)
+        return response
+
+    def _claim(self, view, key):
+        magic, buckets, count, dropped = HEADER.unpack_from(view, 0)
+        if count >= self.max_series:
+            return None
+        offset = HEADER.size + count * SLOT.size
+        SLOT.pack_into(view, offset, key[0], key[1], 0, 0.0, *([0] * (len(BUCKETS) + 1)))
+        # Publish the slot only once it is written, readers stop at the count
+        HEADER.pack_into(view, 0, magic, buckets, count + 1, dropped)
+        self._offsets[key] = offset
+        return offset
+
+    def _open(self):
+        pid = os.getpid()
+        if self._map is not None and self._pid == pid:
+            return self._map
+
+        # Forked workers must not write into the parent's file
+        self._map = self._fd = None
+        os.makedirs(self.directory, exist_ok=True)
+        size = HEADER.size + self.max_series * SLOT.size
+        fd = os.open(os.path.join(self.directory, f'{pid}.bin'), os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(fd).st_size < size:
+            os.ftruncate(fd, size)
+        view = mmap.mmap(fd, size)
+
+        magic, buckets, count, _ = HEADER.unpack_from(view, 0)
+        self._offsets = {}
+        if magic != MAGIC or buckets != len(BUCKETS):
+            view[:] = bytes(size)
+            HEADER.pack_into(view, 0, MAGIC, len(BUCKETS), 0, 0)
+        else:
+            # A reused pid picks up where the earlier process left off
+            for index in range(min(count, self.max_series)):
+                offset = HEADER.size + index * SLOT.size
+                name, status = SLOT.unpack_from(view, offset)[:2]
+                self._offsets[(name.rstrip(b'\0'), status)] = offset
+
+        self._fd, self._map, self._pid = fd, view, pid
+        return view
+
+    def _close(self):
+        if self._map is not None and self._pid == os.getpid():
+            self._map.close()
+            os.close(self._fd)
+        self._map = self._fd = self._pid = None
+        self._offsets = {}
@@ -1,9 +1,9 @@
 from flask import request, current_app, g
 from functools import wraps
 import time
-from datetime import datetime, timedelta
+from datetime import datetime
 from models import SecurityLog
-from extensions import db
+from extensions import audit_sink, rolling_counters
 
 
 class SecurityMiddleware:
@@ -20,22 +20,12 @@ class SecurityMiddleware:
         """Security checks before each request"""
         g.start_time = time.time()
         
-        # Check for blocked IPs
-        if self.is_ip_blocked(request.remote_addr):
-            return self.block_request("IP address is blocked")
+        # IP blocking, request pattern scanning and rate limiting are installed
+        # by ip_access_list, request_scanner and rate_limiter in create_app
         
         # Check for suspicious user agents
         if self.is_suspicious_user_agent(request.headers.get('User-Agent')):
             self.log_suspicious_activity('suspicious_user_agent', request.remote_addr)
-        
-        # Check for suspicious request patterns
-        if self.is_suspicious_request(request):
-            self.log_suspicious_activity('suspicious_request_pattern', request.remote_addr)
-        
-        # Rate limiting for sensitive endpoints
-        if self.should_rate_limit(request):
-            if self.is_rate_limited(request.remote_addr, request.endpoint):
-                return self.block_request("Rate limit exceeded")
     
     def after_request(self, response):
         """Security headers and logging after each request"""
@@ -63,11 +53,6 @@ class SecurityMiddleware:
         
         return response
     
-    def is_ip_blocked(self, ip_address):
-        """Check if IP address is blocked"""
-        blocked_ips = current_app.config.get('BLOCKED_IPS', [])
-        return ip_address in blocked_ips
-    
     def is_suspicious_user_agent(self, user_agent):
         """Check if user agent is suspicious"""
         if not user_agent:
@@ -81,52 +66,11 @@ class SecurityMiddleware:
         
         return any(pattern in user_agent.lower() for pattern in suspicious_patterns)
     
-    def is_suspicious_request(self, request):
-        """Check for suspicious request patterns"""
-        # Check for SQL injection attempts
-        sql_patterns = [
-            'union select', 'drop table', 'delete from', 'insert into',
-            'update set', 'alter table', 'exec(', 'eval('
-        ]
-        
-        # Check for XSS attempts
-        xss_patterns = [
-            '<script', 'javascript:', 'vbscript:', 'onload=',
-            'onerror=', 'onclick=', 'onmouseover='
-        ]
-        
-        # Check request data
-        request_data = str(request.values) + str(request.headers)
-        request_data_lower = request_data.lower()
-        
-        for pattern in sql_patterns + xss_patterns:
-            if pattern in request_data_lower:
-                return True
-        
-        return False
-    
-    def should_rate_limit(self, request):
-        """Determine if request should be rate limited"""
-        sensitive_endpoints = [
-            'auth.login', 'auth.register', 'auth.password_reset_request'
-        ]
-        return request.endpoint in sensitive_endpoints
-    
-    def is_rate_limited(self, ip_address, endpoint):
-        """Check if IP is rate limited for specific endpoint"""
-        # This would integrate with Flask-Limiter
-        # For now, basic implementation
-        return False
-    
-    def block_request(self, reason):
-        """Block suspicious request"""
-        self.log_suspicious_activity('request_blocked', request.remote_addr, reason)
-        return {'error': 'Request blocked for security reasons'}, 403
-    
     def log_suspicious_activity(self, activity_type, ip_address, details=None):
         """Log suspicious activity"""
         try:
-            security_log = SecurityLog(
+            audit_sink.record(
+                SecurityLog,
                 event_type=activity_type,
                 ip_address=ip_address,
                 user_agent=request.headers.get('User-Agent'),
@@ -135,9 +79,6 @@ class SecurityMiddleware:
                 timestamp=datetime.utcnow()
             )
             
-            db.session.add(security_log)
-            db.session.commit()
-            
         except Exception as e:
             current_app.logger.error(f"Failed to log suspicious activity: {e}")
     
@@ -146,7 +87,8 @@ class SecurityMiddleware:
         try:
             # Only log sensitive requests
             if request.endpoint in ['auth.login', 'auth.register', 'auth.password_reset']:
-                security_log = SecurityLog(
+                audit_sink.record(
+                    SecurityLog,
                     event_type='request_logged',
                     ip_address=request.remote_addr,
                     user_agent=request.headers.get('User-Agent'),
@@ -155,9 +97,6 @@ class SecurityMiddleware:
                     timestamp=datetime.utcnow()
                 )
                 
-                db.session.add(security_log)
-                db.session.commit()
-                
         except Exception as e:
             current_app.logger.error(f"Failed to log request details: {e}")
     
@@ -210,7 +149,8 @@ def require_secure_headers(f):
 def log_security_event(event_type, details, severity='info', user_id=None):
     """Helper function to log security events"""
     try:
-        security_log = SecurityLog(
+        audit_sink.record(
+            SecurityLog,
             user_id=user_id,
             event_type=event_type,
             ip_address=request.remote_addr,
@@ -220,9 +160,6 @@ def log_security_event(event_type, details, severity='info', user_id=None):
             timestamp=datetime.utcnow()
         )
         
-        db.session.add(security_log)
-        db.session.commit()
-        
     except Exception as e:
         current_app.logger.error(f"Failed to log security event: {e}")
 
@@ -230,15 +167,11 @@ def log_security_event(event_type, details, severity='info', user_id=None):
 def check_request_frequency(ip_address, window_minutes=15, max_requests=100):
     """Check if IP has made too many requests in a time window"""
     try:
-        from models import SecurityLog
-        
-        window_start = datetime.utcnow() - timedelta(minutes=window_minutes)
-        
-        request_count = SecurityLog.query.filter(
-            SecurityLog.ip_address == ip_address,
-            SecurityLog.timestamp >= window_start,
-            SecurityLog.event_type.in_(['request_logged', 'login_attempt'])
-        ).count()
+        request_count = rolling_counters.count(
+            ip_address,
+            ['security_logs:request_logged', 'security_logs:login_attempt'],
+            window_minutes * 60
+        )
         
         return request_count > max_requests
         
@@ -0,0 +1,123 @@
+import os
+import time
+import logging
+from collections import Counter
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+def parameter_shape(parameters):
+    """Describe bound parameters by type only, so values never reach the log"""
+    if isinstance(parameters, dict):
+        shapes = (f'{key}: {type(value).__name__}' for key, value in parameters.items())
+        return '{' + ', '.join(shapes) + '}'
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            return f'{len(parameters)} x {parameter_shape(parameters[0])}'
+        return '(' + ', '.join(type(value).__name__ for value in parameters) + ')'
+    return type(parameters).__name__
+
+
+class RequestQueries:
+    """Queries run while handling one request"""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = Counter()
+
+    def repeated(self, threshold):
+        """Statements run at least threshold times, most frequent first"""
+        return [
+            (statement, count) for statement, count in self.statements.most_common()
+            if count >= threshold
+        ]
+
+
+class QueryProfiler:
+    """Counts queries and database time per request from SQLAlchemy engine events
+
+    Every statement run on behalf of a request is timed. Statements slower
+    than ``slow_threshold`` seconds are logged with their parameter types
+    and the endpoint, to ``SLOW_QUERY_LOG`` or else through the app logger.
+    When a request finishes, any identical statement run
+    ``repeat_threshold`` times or more is reported as a likely N+1 pattern.
+    Queries from background threads, such as the audit writer, are not
+    attributed to a request.
+    """
+
+    def __init__(self, app=None, slow_threshold=0.1, repeat_threshold=5, add_header=None):
+        self.slow_threshold = slow_threshold
+        self.repeat_threshold = repeat_threshold
+        self.add_header = add_header
+        self.logger = logging.getLogger('aura.slow_queries')
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Read thresholds from app config and attach to the engine and request hooks"""
+        self.slow_threshold = app.config.get('SLOW_QUERY_THRESHOLD', self.slow_threshold)
+        self.repeat_threshold = app.config.get('QUERY_REPEAT_THRESHOLD', self.repeat_threshold)
+        self.add_header = app.config.get('QUERY_PROFILER_HEADER', self.add_header)
+
+        log_file = app.config.get('SLOW_QUERY_LOG')
+        if log_file:
+            self.logger = logging.getLogger('aura.slow_queries')
+            # FileHandler keeps the absolute path, so compare against that
+            log_path = os.path.abspath(log_file)
+            if not any(getattr(h, 'baseFilename', None) == log_path for h in self.logger.handlers):
+                handler = logging.FileHandler(log_file)
+                handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+                self.logger.addHandler(handler)
+                self.logger.setLevel(logging.INFO)
+        else:
+            # A child of app.logger, so reports propagate to the app's log handlers
+            self.logger = app.logger.getChild('slow_queries')
+
+        if not event.contains(Engine, 'before_cursor_execute', self._before_execute):
+            event.listen(Engine, 'before_cursor_execute', self._before_execute)
+            event.listen(Engine, 'after_cursor_execute', self._after_execute)
+        app.after_request(self._finish_request)
+        app.extensions['query_profiler'] = self
+
+    def current(self):
+        """Query stats for the active request, or None outside a request"""
+        if not has_request_context():
+            return None
+        stats = g.get('db_queries')
+        if stats is None:
+            stats = g.db_queries = RequestQueries()
+        return stats
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        context._query_start = time.perf_counter()
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._query_start
+        stats = self.current()
+        if stats is None:
+            return
+        stats.count += 1
+        stats.seconds += elapsed
+        stats.statements[statement] += 1
+        if elapsed >= self.slow_threshold:
+            self.logger.warning(
+                f'Slow query {elapsed * 1000:.1f}ms on {request.endpoint}: '
+                f'{" ".join(statement.split())} params={parameter_shape(parameters)}'
+            )
+
+    def _finish_request(self, response):
+        stats = g.get('db_queries')
+        if stats is None:
+            return response
+        for statement, count in stats.repeated(self.repeat_threshold):
+            self.logger.warning(
+                f'Possible N+1 on {request.endpoint}: statement ran {count} times: '
+                f'{" ".join(statement.split())}'
+            )
+        add_header = self.add_header if self.add_header is not None else current_app.debug
+        if add_header:
+            response.headers['X-DB-Queries'] = f'{stats.count}; {stats.seconds * 1000:.2f}ms'
+        return response
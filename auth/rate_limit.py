@@ -0,0 +1,225 @@
+import os
+import re
+import mmap
+import time
+import struct
+import hashlib
+import threading
+from flask import current_app, request
+
+try:
+    import fcntl
+except ImportError:  # Windows dev servers run a single process anyway
+    fcntl = None
+
+
+# key hash, window index, current count, previous count, period, padding
+SLOT = struct.Struct('<QqIIII')
+MAX_PROBES = 8
+
+# Limits from SECURITY_FEATURES.md, used unless RATE_LIMITS is configured
+DEFAULT_LIMITS = {
+    'auth.login': '5 per minute',
+    'auth.register': '3 per hour',
+    'auth.password_reset_request': '3 per hour',
+}
+DEFAULT_SHARED_LIMITS = '50 per hour; 200 per day'
+
+_PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+_LIMIT_RE = re.compile(r'^\s*(\d+)\s*(?:per|/)\s*(second|minute|hour|day)s?\s*$', re.IGNORECASE)
+
+
+def parse_limits(spec):
+    """Parse '5 per minute; 50/hour' into [(5, 60), (50, 3600)]"""
+    if not spec:
+        return []
+    if not isinstance(spec, str):
+        return list(spec)
+    limits = []
+    for part in spec.split(';'):
+        match = _LIMIT_RE.match(part)
+        if not match:
+            raise ValueError(f"Invalid rate limit '{part.strip()}'.")
+        limits.append((int(match.group(1)), _PERIODS[match.group(2).lower()]))
+    return limits
+
+
+class RateLimiter:
+    """Sliding-window rate limiter shared by all workers through a memory-mapped file
+
+    The file is a fixed-size open-addressing hash table of counters. Each
+    slot keeps the request count of the current and previous fixed window,
+    and the sliding-window estimate weights the previous window by how much
+    of it still overlaps. Every gunicorn worker maps the same file under the
+    instance folder, and updates are serialized with ``flock`` so the counts
+    are exact across processes without running Redis.
+
+    ``init_app`` installs a ``before_request`` hook that answers form
+    submissions (POSTs) to limited endpoints with 429 once the client is
+    over a limit. Allowlisted IPs are never limited.
+    """
+
+    def __init__(self, app=None, path=None, slots=65536):
+        self.path = path
+        self.slots = slots
+        self.limits = {}
+        self.default_limits = []
+        self._pid = None
+        self._fd = None
+        self._map = None
+        self._lock = threading.Lock()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Load limits and the counter file location from app config"""
+        self.path = app.config.get('RATE_LIMIT_FILE') or os.path.join(app.instance_path, 'ratelimit.bin')
+        self.slots = app.config.get('RATE_LIMIT_SLOTS', self.slots)
+        self.limits = {
+            endpoint: parse_limits(spec)
+            for endpoint, spec in app.config.get('RATE_LIMITS', DEFAULT_LIMITS).items()
+        }
+        self.default_limits = parse_limits(app.config.get('RATE_LIMIT_SHARED', DEFAULT_SHARED_LIMITS))
+        self.close()
+        app.before_request(self._limit_request)
+        app.extensions['rate_limiter'] = self
+
+    def _limit_request(self):
+        """Reject a POST to a limited endpoint with 429 if the client is over its limit"""
+        # Only form submissions count as attempts, not loading the page
+        if request.method != 'POST' or not self.applies_to(request.endpoint):
+            return None
+        ip_access_list = current_app.extensions.get('ip_access_list')
+        if ip_access_list is not None and ip_access_list.is_allowed(request.remote_addr):
+            return None
+        if self.is_limited(request.remote_addr, request.endpoint):
+            from .middleware import log_security_event
+
+            log_security_event('request_blocked', 'Rate limit exceeded', 'warning')
+            return {'error': 'Request blocked for security reasons'}, 429
+        return None
+
+    def applies_to(self, endpoint):
+        """Whether endpoint has its own limits configured"""
+        return endpoint in self.limits
+
+    def is_limited(self, ip_address, endpoint):
+        """Count a hit for ip_address on endpoint; True if it is over any limit
+
+        The endpoint's own limits and the shared limits across all limited
+        endpoints are checked together. A rejected hit is not counted.
+        """
+        checks = [(f'{endpoint}|{ip_address}', limit, period) for limit, period in self.limits.get(endpoint, [])]
+        checks += [(f'*|{ip_address}', limit, period) for limit, period in self.default_limits]
+        if not checks:
+            return False
+        return not self.hit(checks)
+
+    def hit(self, checks, now=None):
+        """Atomically check and count (key, limit, period) tuples; False if any is exhausted"""
+        now = time.time() if now is None else now
+        with self._lock:
+            view = self._open()
+            self._acquire()
+            try:
+                found = []
+                taken = set()
+                for key, limit, period in checks:
+                    key_hash = self._hash(f'{key}|{period}')
+                    offset, window, current, previous = self._find(view, key_hash, period, now, taken)
+                    elapsed = (now % period) / period
+                    if previous * (1 - elapsed) + current >= limit:
+                        return False
+                    taken.add(offset)
+                    found.append((offset, key_hash, window, current, previous, period))
+                for offset, key_hash, window, current, previous, period in found:
+                    SLOT.pack_into(view, offset, key_hash, window, current + 1, previous, period, 0)
+                return True
+            finally:
+                self._release()
+
+    def reset(self):
+        """Clear every counter"""
+        with self._lock:
+            view = self._open()
+            self._acquire()
+            try:
+                view[:] = bytes(len(view))
+            finally:
+                self._release()
+
+    def close(self):
+        """Unmap the counter file"""
+        with self._lock:
+            if self._map is not None and self._pid == os.getpid():
+                self._map.close()
+                os.close(self._fd)
+            self._map = self._fd = self._pid = None
+
+    @staticmethod
+    def _hash(key):
+        # Zero marks an empty slot, so never hand it out as a key hash
+        return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'little') or 1
+
+    def _find(self, view, key_hash, period, now, taken):
+        """Locate or claim the slot for key_hash and roll its windows forward to now"""
+        window = int(now // period)
+        start = key_hash % self.slots
+        free = oldest = None
+        oldest_age = -1
+
+        for probe in range(MAX_PROBES):
+            offset = ((start + probe) % self.slots) * SLOT.size
+            if offset in taken:
+                continue
+            slot_hash, slot_window, current, previous, slot_period, _ = SLOT.unpack_from(view, offset)
+            if slot_hash == key_hash and slot_period == period:
+                if slot_window == window:
+                    return offset, window, current, previous
+                if slot_window == window - 1:
+                    return offset, window, 0, current
+                return offset, window, 0, 0
+            if slot_hash == 0:
+                # Slots are only ever zeroed all at once, so the key can't be further on
+                return (free if free is not None else offset), window, 0, 0
+            if int(now // slot_period) - slot_window > 1:
+                if free is None:
+                    free = offset
+            else:
+                age = now - slot_window * slot_period
+                if age > oldest_age:
+                    oldest, oldest_age = offset, age
+
+        # Claim an empty or expired slot, or evict the least recently rolled one
+        return (free if free is not None else oldest), window, 0, 0
+
+    def _open(self):
+        pid = os.getpid()
+        if self._map is not None and self._pid == pid:
+            return self._map
+
+        # An fd inherited across fork shares the parent's flock, so reopen
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        size = self.slots * SLOT.size
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(fd).st_size < size:
+                os.ftruncate(fd, size)
+        finally:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+        self._fd = fd
+        self._map = mmap.mmap(fd, size)
+        self._pid = pid
+        return self._map
+
+    def _acquire(self):
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+
+    def _release(self):
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
@@ -0,0 +1,190 @@
+import os
+import gzip
+import json
+import time
+from datetime import date, datetime, timedelta
+from sqlalchemy import func, select
+
+
+ARCHIVED_MODELS = ('security_logs', 'login_attempts')
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+class LogArchiver:
+    """Moves old SecurityLog and LoginAttempt rows into gzip NDJSON partitions
+
+    Rows older than ``retention_days`` are read oldest first in batches of
+    ``batch_size`` through the timestamp index. Each batch is appended to
+    ``<archive_dir>/<table>/<YYYY-MM-DD>.ndjson.gz`` and fsynced, and only
+    then deleted in its own short transaction, so the SQLite writer lock is
+    held for one small DELETE at a time. A crash between the two steps can
+    leave a batch archived twice; ``ArchiveReader`` drops those duplicates.
+    """
+
+    def __init__(self, app=None, archive_dir=None, retention_days=90, batch_size=1000, pause=0.05):
+        self.archive_dir = archive_dir
+        self.retention_days = retention_days
+        self.batch_size = batch_size
+        self.pause = pause
+        self.engine = None
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Read the archive location, retention window and batch size from app config"""
+        from extensions import sqlite_profile
+
+        self.archive_dir = app.config.get('LOG_ARCHIVE_DIR') or os.path.join(app.instance_path, 'archive')
+        self.retention_days = app.config.get('LOG_RETENTION_DAYS', self.retention_days)
+        self.batch_size = app.config.get('LOG_ARCHIVE_BATCH_SIZE', self.batch_size)
+        with app.app_context():
+            self.engine = sqlite_profile.write_engine('audit')
+        app.extensions['log_archiver'] = self
+
+    def cutoff(self, now=None):
+        """Rows with a timestamp before this naive-UTC time are due for archiving"""
+        now = now or datetime.utcnow()
+        return now - timedelta(days=self.retention_days)
+
+    def archive(self, model, cutoff=None, dry_run=False):
+        """Archive and delete model rows older than cutoff; returns the number moved
+
+        With ``dry_run`` nothing is written and the number of rows due is returned.
+        """
+        table = model.__table__
+        cutoff = cutoff or self.cutoff()
+        query = (
+            select(table)
+            .where(table.c.timestamp < cutoff)
+            .order_by(table.c.timestamp, table.c.id)
+            .limit(self.batch_size)
+        )
+        if dry_run:
+            with self.engine.connect() as connection:
+                return connection.execute(
+                    select(func.count()).select_from(table).where(table.c.timestamp < cutoff)
+                ).scalar()
+
+        moved = 0
+        while True:
+            with self.engine.connect() as connection:
+                rows = [row._asdict() for row in connection.execute(query)]
+            if not rows:
+                return moved
+            self._write(table.name, rows)
+            with self.engine.begin() as connection:
+                connection.execute(table.delete().where(table.c.id.in_([row['id'] for row in rows])))
+            moved += len(rows)
+            if len(rows) < self.batch_size:
+                return moved
+            time.sleep(self.pause)
+
+    def vacuum(self, pages=None):
+        """Return free pages to the OS with an incremental vacuum
+
+        Returns the number of free pages before and after, or None when the
+        database isn't in incremental auto_vacuum mode (see ``enable_incremental_vacuum``).
+        """
+        with self.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+            if connection.exec_driver_sql('PRAGMA auto_vacuum').scalar() != 2:
+                return None
+            before = connection.exec_driver_sql('PRAGMA freelist_count').scalar()
+            statement = 'PRAGMA incremental_vacuum' + (f'({int(pages)})' if pages else '')
+            # sqlite3's execute() steps the pragma once, freeing a single page;
+            # executescript() runs it to completion
+            connection.connection.driver_connection.executescript(statement)
+            after = connection.exec_driver_sql('PRAGMA freelist_count').scalar()
+        return before, after
+
+    def enable_incremental_vacuum(self):
+        """Switch the database to incremental auto_vacuum; runs one full VACUUM"""
+        with self.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+            connection.exec_driver_sql('PRAGMA auto_vacuum = INCREMENTAL')
+            connection.exec_driver_sql('VACUUM')
+
+    def _write(self, table_name, rows):
+        partitions = {}
+        for row in rows:
+            partitions.setdefault(row['timestamp'].date(), []).append(row)
+
+        directory = os.path.join(self.archive_dir, table_name)
+        os.makedirs(directory, exist_ok=True)
+        for day, day_rows in partitions.items():
+            data = ''.join(json.dumps(row, default=_json_default) + '\n' for row in day_rows).encode()
+            # Each append is a complete gzip member; gzip readers concatenate them
+            with open(os.path.join(directory, f'{day.isoformat()}.ndjson.gz'), 'ab') as f:
+                f.write(gzip.compress(data))
+                f.flush()
+                os.fsync(f.fileno())
+
+
+class ArchiveReader:
+    """Queries archived partitions for forensics
+
+    Only the partitions whose date falls inside the requested range are
+    opened, and rows are streamed one at a time.
+    """
+
+    def __init__(self, archive_dir):
+        self.archive_dir = archive_dir
+
+    def partitions(self, table_name, start=None, end=None):
+        """Sorted (date, path) pairs for table_name that may hold rows in [start, end)"""
+        directory = os.path.join(self.archive_dir, table_name)
+        try:
+            names = os.listdir(directory)
+        except OSError:
+            return []
+        found = []
+        for name in names:
+            if not name.endswith('.ndjson.gz'):
+                continue
+            try:
+                day = date.fromisoformat(name[:-len('.ndjson.gz')])
+            except ValueError:
+                continue
+            if start is not None and day < start.date():
+                continue
+            if end is not None and datetime.combine(day, datetime.min.time()) >= end:
+                continue
+            found.append((day, os.path.join(directory, name)))
+        return sorted(found)
+
+    def query(self, table_name, start=None, end=None, **filters):
+        """Yield archived rows as dicts, oldest partition first
+
+        ``start``/``end`` bound the timestamp as naive-UTC datetimes, and
+        every other keyword must equal the row's value, e.g.
+        ``ip_address='203.0.113.7'``.
+        """
+        if table_name not in ARCHIVED_MODELS:
+            raise ValueError(f"Unknown archive table '{table_name}'.")
+        for _, path in self.partitions(table_name, start, end):
+            for row in self._read(path):
+                timestamp = datetime.fromisoformat(row['timestamp'])
+                if start is not None and timestamp < start:
+                    continue
+                if end is not None and timestamp >= end:
+                    continue
+                if any(row.get(key) != value for key, value in filters.items()):
+                    continue
+                yield row
+
+    def _read(self, path):
+        seen = set()
+        try:
+            with gzip.open(path, 'rt') as f:
+                for line in f:
+                    row = json.loads(line)
+                    if row['id'] not in seen:
+                        seen.add(row['id'])
+                        yield row
+        except (EOFError, gzip.BadGzipFile):
+            # A member cut short by a crash mid-append; everything before it is intact
+            return
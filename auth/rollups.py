@@ -0,0 +1,165 @@
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import DateTime, text, bindparam
+
+
+# Stored in the same text form SQLAlchemy uses for naive DateTime values, so
+# rollup hours compare correctly against bound datetimes
+_HOUR = "strftime('%Y-%m-%d %H:00:00.000000', timestamp)"
+
+# Source table -> (metric expression, extra WHERE condition) pairs
+SOURCES = {
+    'login_attempts': [
+        ("CASE WHEN success THEN 'logins' ELSE 'failed_logins' END", None),
+    ],
+    'security_logs': [
+        ("'events:' || COALESCE(severity, 'info')", None),
+        ("'blocked_requests'", "event_type = 'request_blocked'"),
+    ],
+}
+METRICS = (
+    'logins', 'failed_logins', 'blocked_requests',
+    'events:info', 'events:warning', 'events:error', 'events:critical',
+)
+
+
+def _rollup_statement(table, metric, condition):
+    return text(
+        f"INSERT INTO hourly_rollups (metric, hour, count) "
+        f"SELECT {metric}, {_HOUR}, COUNT(*) FROM {table} "
+        f"WHERE id > :last_id AND id <= :upper AND timestamp IS NOT NULL"
+        + (f" AND {condition}" if condition else "")
+        + " GROUP BY 1, 2 "
+        "ON CONFLICT (metric, hour) DO UPDATE SET count = hourly_rollups.count + excluded.count"
+    )
+
+
+_ROLLUPS = {
+    table: [_rollup_statement(table, metric, condition) for metric, condition in parts]
+    for table, parts in SOURCES.items()
+}
+_CLAIM = text(
+    "UPDATE rollup_state SET last_id = :upper WHERE source = :source AND last_id = :last_id"
+)
+_SEED = text("INSERT OR IGNORE INTO rollup_state (source, last_id) VALUES (:source, 0)")
+_STATE = text("SELECT last_id FROM rollup_state WHERE source = :source")
+_SERIES = text(
+    "SELECT metric, hour, count FROM hourly_rollups "
+    "WHERE metric IN :metrics AND hour >= :since"
+).bindparams(bindparam('metrics', expanding=True), bindparam('since', type_=DateTime))
+_DAILY_SERIES = text(
+    "SELECT metric, substr(hour, 1, 10), SUM(count) FROM hourly_rollups "
+    "WHERE metric IN :metrics AND hour >= :since GROUP BY metric, substr(hour, 1, 10)"
+).bindparams(bindparam('metrics', expanding=True), bindparam('since', type_=DateTime))
+
+
+def _hour(timestamp):
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp.replace(minute=0, second=0, microsecond=0)
+
+
+class HourlyRollups:
+    """Hourly event counts kept in step with the log tables by row id
+
+    ``rollup_state`` remembers the highest login_attempts/security_logs id
+    already counted. ``update`` folds each new id range into
+    ``hourly_rollups`` with one GROUP BY per metric, and advances the
+    watermark in the same transaction. The watermark is claimed with a
+    compare-and-set UPDATE before anything is counted, so two workers
+    updating at once can't count the same rows twice. Charts then read one
+    row per metric per hour instead of scanning the raw logs.
+
+    Rows must be rolled up before they are archived; ``archive_logs.py run``
+    calls ``update`` first.
+    """
+
+    def __init__(self, app=None, batch_rows=50000):
+        self.batch_rows = batch_rows
+        self.engine = None
+        self.read_engine = None
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Read the batch size from app config"""
+        from extensions import sqlite_profile
+
+        self.batch_rows = app.config.get('ROLLUP_BATCH_ROWS', self.batch_rows)
+        with app.app_context():
+            self.engine = sqlite_profile.write_engine('audit')
+            self.read_engine = sqlite_profile.read_engine('audit')
+        app.extensions['hourly_rollups'] = self
+
+    def update(self, max_batches=None):
+        """Count log rows added since the last update; returns the number of ids covered
+
+        Each source advances ``batch_rows`` ids per transaction. ``max_batches``
+        bounds the work per source, e.g. to keep a page load fast while a
+        large backlog is still being counted.
+        """
+        covered = 0
+        for source, statements in _ROLLUPS.items():
+            last_id, max_id = self._bounds(source)
+            batches = 0
+            while last_id < max_id and (max_batches is None or batches < max_batches):
+                upper = min(last_id + self.batch_rows, max_id)
+                if not self._fold(source, statements, last_id, upper):
+                    break
+                covered += upper - last_id
+                last_id = upper
+                batches += 1
+        return covered
+
+    def _bounds(self, source):
+        with self.read_engine.connect() as connection:
+            last_id = connection.execute(_STATE, {'source': source}).scalar()
+            max_id = connection.exec_driver_sql(f"SELECT MAX(id) FROM {source}").scalar() or 0
+        if last_id is None:
+            with self.engine.begin() as connection:
+                connection.execute(_SEED, {'source': source})
+            last_id = 0
+        return last_id, max_id
+
+    def _fold(self, source, statements, last_id, upper):
+        params = {'source': source, 'last_id': last_id, 'upper': upper}
+        with self.engine.begin() as connection:
+            # The claim takes SQLite's write lock first; a worker that lost the
+            # race finds the watermark already moved and counts nothing
+            if connection.execute(_CLAIM, params).rowcount != 1:
+                return False
+            for statement in statements:
+                connection.execute(statement, params)
+        return True
+
+    def series(self, metrics=METRICS, days=30, daily=False, now=None):
+        """Per-metric counts for the last ``days`` days, oldest first, gaps filled with 0
+
+        Returns ``(labels, {metric: [count, ...]})`` where labels are hour
+        starts (``YYYY-MM-DD HH:00``) or, with ``daily``, dates.
+        """
+        end = _hour(now or datetime.now(timezone.utc))
+        since = end - timedelta(days=days) + timedelta(hours=1)
+        if daily:
+            since = since.replace(hour=0)
+            labels = [(since + timedelta(days=n)).date().isoformat() for n in range((end - since).days + 1)]
+            statement = _DAILY_SERIES
+        else:
+            labels = [
+                (since + timedelta(hours=n)).strftime('%Y-%m-%d %H:00')
+                for n in range(int((end - since).total_seconds() // 3600) + 1)
+            ]
+            statement = _SERIES
+
+        counts = defaultdict(dict)
+        with self.read_engine.connect() as connection:
+            for metric, bucket, count in connection.execute(statement, {'metrics': list(metrics), 'since': since}):
+                key = bucket[:10] if daily else bucket[:16]
+                counts[metric][key] = count
+        return labels, {metric: [counts[metric].get(label, 0) for label in labels] for metric in metrics}
+
+    def totals(self, metrics=METRICS, hours=24, now=None):
+        """Sum of each metric over the last ``hours`` whole hours, including the current one"""
+        _, series = self.series(metrics, days=hours / 24, now=now)
+        return {metric: sum(values) for metric, values in series.items()}
@@ -1,9 +1,9 @@
 # auth/routes.py
 from flask import Blueprint, render_template, request, redirect, url_for, flash
 from flask_login import login_user, logout_user, login_required, current_user
-from werkzeug.security import generate_password_hash, check_password_hash
 from models import User
-from extensions import db
+from extensions import db, password_hasher
+from .hashing import HashingUnavailable
 from .forms import SecureLoginForm, SecureRegisterForm, PasswordResetRequestForm
 
 auth_bp = Blueprint('auth', __name__)
@@ -29,7 +29,18 @@ def login():
         email = form.email.data
         password = form.password.data
         user = User.query.filter_by(email=email).first()
-        if user and check_password_hash(user.password_hash, password):
+        try:
+            valid = user is not None and password_hasher.verify(user.password_hash, password)
+        except HashingUnavailable:
+            flash('The server is busy, please try again in a moment.', 'error')
+            return render_template('auth/login.html', form=form), 503
+        if valid:
+            if password_hasher.needs_rehash(user.password_hash):
+                try:
+                    user.password_hash = password_hasher.hash(password)
+                    db.session.commit()
+                except HashingUnavailable:
+                    pass  # Upgrade on a later login
             login_user(user, remember=form.remember_me.data)
             return redirect(url_for('main.index'))
         else:
@@ -46,10 +57,15 @@ def register():
         if User.query.filter_by(email=email).first():
             flash('Email already registered', 'error')
             return render_template('auth/register.html', form=form)
+        try:
+            password_hash = password_hasher.hash(password)
+        except HashingUnavailable:
+            flash('The server is busy, please try again in a moment.', 'error')
+            return render_template('auth/register.html', form=form), 503
         user = User(
             username=username,
             email=email,
-            password_hash=generate_password_hash(password)
+            password_hash=password_hash
         )
         db.session.add(user)
         db.session.commit()
@@ -0,0 +1,156 @@
+import re
+from flask import request
+
+
+# Substrings that flag a request as a likely SQL injection or XSS probe
+REQUEST_RULES = {
+    'sql_union_select': 'union select',
+    'sql_drop_table': 'drop table',
+    'sql_delete_from': 'delete from',
+    'sql_insert_into': 'insert into',
+    'sql_update_set': 'update set',
+    'sql_alter_table': 'alter table',
+    'sql_exec': 'exec(',
+    'sql_eval': 'eval(',
+    'xss_script_tag': '<script',
+    'xss_javascript_uri': 'javascript:',
+    'xss_vbscript_uri': 'vbscript:',
+    'xss_onload': 'onload=',
+    'xss_onerror': 'onerror=',
+    'xss_onclick': 'onclick=',
+    'xss_onmouseover': 'onmouseover=',
+}
+
+# Markup that has no business appearing in a single form field such as an email
+FIELD_RULES = {
+    'xss_script_tag': '<script',
+    'xss_javascript_uri': 'javascript:',
+    'xss_vbscript_uri': 'vbscript:',
+    'xss_onload': 'onload=',
+    'xss_onerror': 'onerror=',
+    'xss_iframe_tag': '<iframe',
+    'xss_object_tag': '<object',
+    'xss_embed_tag': '<embed',
+}
+
+# Regular expressions removed by SecurityManager.sanitize_input
+SANITIZE_PATTERNS = [
+    r'<script[^>]*>.*?</script>',
+    r'<iframe[^>]*>.*?</iframe>',
+    r'<object[^>]*>.*?</object>',
+    r'<embed[^>]*>.*?</embed>',
+    r'javascript:',
+    r'vbscript:',
+    r'onload=',
+    r'onerror=',
+    r'onclick=',
+    r'onmouseover=',
+]
+
+
+def _trie_pattern(literals):
+    """Build a regex alternation with shared prefixes factored out
+
+    ``union select|update set`` becomes ``u(?:nion\\ select|pdate\\ set)``. With
+    every branch starting on a distinct character the regex engine can skip
+    ahead using its first-character set instead of trying each branch at
+    every position.
+    """
+    trie = {}
+    for literal in literals:
+        node = trie
+        for char in literal:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        optional = '' in node
+        if len(branches) == 1 and not optional:
+            return branches[0]
+        return '(?:' + '|'.join(branches) + ')' + ('?' if optional else '')
+
+    return build(trie)
+
+
+class ThreatScanner:
+    """Matches a set of literal rules in one pass over each string
+
+    Rules are compiled into a single prefix-factored regex. Input is
+    lowercased once and searched case-sensitively, which keeps the regex
+    engine's fast first-character scan that IGNORECASE would disable. The
+    rule that matched is looked up from the matched text.
+    """
+
+    def __init__(self, rules):
+        self.rules = dict(rules)
+        self._rule_by_literal = {literal.lower(): name for name, literal in self.rules.items()}
+        self._pattern = re.compile(_trie_pattern(self._rule_by_literal))
+
+    def init_app(self, app):
+        """Scan every request before it is handled and log the ones that match a rule"""
+        app.before_request(self._log_request)
+
+    def _log_request(self):
+        """Record a suspicious_request_pattern event; the request is still served"""
+        matched_rule = self.scan_request(request)
+        if matched_rule:
+            from .middleware import log_security_event
+
+            log_security_event(
+                'suspicious_request_pattern',
+                f'Matched rule {matched_rule} from {request.remote_addr}', 'warning'
+            )
+
+    def scan(self, text):
+        """Return the name of the first rule found in text, or None"""
+        if not text:
+            return None
+        match = self._pattern.search(text.lower())
+        return self._rule_by_literal[match.group()] if match else None
+
+    def scan_items(self, items):
+        """Scan the keys and values of (key, value) pairs without joining them"""
+        search = self._pattern.search
+        for key, value in items:
+            match = search(key.lower()) or (value and search(value.lower()))
+            if match:
+                return self._rule_by_literal[match.group()]
+        return None
+
+    def scan_values(self, values):
+        """Scan each string in values, stopping at the first match"""
+        search = self._pattern.search
+        for value in values:
+            match = value and search(value.lower())
+            if match:
+                return self._rule_by_literal[match.group()]
+        return None
+
+    def scan_request(self, request):
+        """Scan query string, form fields and header values of a Flask request
+
+        Header values are read straight from the WSGI environ. Header names
+        are skipped because every rule contains a character (space, ``(``,
+        ``<``, ``:`` or ``=``) that is not allowed in a header name.
+        """
+        environ = request.environ
+        return (
+            self.scan_items(request.args.items(multi=True))
+            or self.scan_items(request.form.items(multi=True))
+            or self.scan_values(value for key, value in environ.items() if key.startswith('HTTP_'))
+            or self.scan(environ.get('CONTENT_TYPE'))
+        )
+
+
+request_scanner = ThreatScanner(REQUEST_RULES)
+field_scanner = ThreatScanner(FIELD_RULES)
+
+_sanitize_pattern = re.compile('|'.join(f'(?:{pattern})' for pattern in SANITIZE_PATTERNS), re.IGNORECASE)
+
+
+def sanitize(text):
+    """Strip dangerous markup in a single regex pass"""
+    return _sanitize_pattern.sub('', text)
@@ -1,11 +1,12 @@
 import re
 import hashlib
 import ipaddress
-from datetime import datetime, timedelta
+from datetime import datetime
 from flask import request, current_app
 from models import LoginAttempt, SecurityLog, User
-from extensions import db
+from extensions import audit_sink, ip_access_list, rolling_counters
 from urllib.parse import urlparse
+from .scanner import sanitize
 
 
 class SecurityManager:
@@ -29,6 +30,9 @@ class SecurityManager:
     @staticmethod
     def is_suspicious_ip(ip_address):
         """Check if IP address is suspicious"""
+        if ip_access_list.is_allowed(ip_address):
+            return False
+        
         try:
             ip = ipaddress.ip_address(ip_address)
             
@@ -36,14 +40,9 @@ class SecurityManager:
             if ip.is_private or ip.is_loopback:
                 return True
                 
-            # Check for known malicious IP ranges (example)
-            malicious_ranges = [
-                # Add known malicious IP ranges here
-            ]
-            
-            for ip_range in malicious_ranges:
-                if ip in ipaddress.ip_network(ip_range):
-                    return True
+            # Check the configured blocklist of known malicious ranges
+            if ip_access_list.is_blocked(ip_address):
+                return True
                     
             return False
         except ValueError:
@@ -77,7 +76,8 @@ class SecurityManager:
     def log_login_attempt(email, success, failure_reason=None):
         """Log login attempt for security monitoring"""
         try:
-            login_attempt = LoginAttempt(
+            audit_sink.record(
+                LoginAttempt,
                 ip_address=request.remote_addr,
                 user_agent=request.headers.get('User-Agent'),
                 email=email,
@@ -86,9 +86,6 @@ class SecurityManager:
                 timestamp=datetime.utcnow()
             )
             
-            db.session.add(login_attempt)
-            db.session.commit()
-            
         except Exception as e:
             current_app.logger.error(f"Failed to log login attempt: {e}")
     
@@ -96,7 +93,8 @@ class SecurityManager:
     def log_security_event(user_id, event_type, details, severity='info'):
         """Log security-related events"""
         try:
-            security_log = SecurityLog(
+            audit_sink.record(
+                SecurityLog,
                 user_id=user_id,
                 event_type=event_type,
                 ip_address=request.remote_addr,
@@ -106,9 +104,6 @@ class SecurityManager:
                 timestamp=datetime.utcnow()
             )
             
-            db.session.add(security_log)
-            db.session.commit()
-            
         except Exception as e:
             current_app.logger.error(f"Failed to log security event: {e}")
     
@@ -116,12 +111,7 @@ class SecurityManager:
     def check_rate_limit(ip_address, action, max_attempts, window_minutes):
         """Check if rate limit is exceeded for an action"""
         try:
-            window_start = datetime.utcnow() - timedelta(minutes=window_minutes)
-            
-            attempts = LoginAttempt.query.filter(
-                LoginAttempt.ip_address == ip_address,
-                LoginAttempt.timestamp >= window_start
-            ).count()
+            attempts = rolling_counters.count(ip_address, 'login_attempts', window_minutes * 60)
             
             return attempts >= max_attempts
             
@@ -135,23 +125,8 @@ class SecurityManager:
         if not input_string:
             return input_string
             
-        # Remove potentially dangerous HTML tags and attributes
-        dangerous_patterns = [
-            r'<script[^>]*>.*?</script>',
-            r'<iframe[^>]*>.*?</iframe>',
-            r'<object[^>]*>.*?</object>',
-            r'<embed[^>]*>.*?</embed>',
-            r'javascript:',
-            r'vbscript:',
-            r'onload=',
-            r'onerror=',
-            r'onclick=',
-            r'onmouseover='
-        ]
-        
-        sanitized = input_string
-        for pattern in dangerous_patterns:
-            sanitized = re.sub(pattern, '', sanitized, flags=re.IGNORECASE)
+        # Remove potentially dangerous HTML tags and attributes in one pass
+        sanitized = sanitize(input_string)
             
         return sanitized.strip()
     
@@ -0,0 +1,106 @@
+import time
+import threading
+from collections import OrderedDict
+from flask_login import UserMixin
+from invalidation import CommitWatcher
+
+
+class UserSnapshot(UserMixin):
+    """Read-only copy of a User row that is safe to share between requests"""
+
+    def __init__(self, values):
+        object.__setattr__(self, '_values', values)
+
+    def __getattr__(self, name):
+        try:
+            return self._values[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __setattr__(self, name, value):
+        raise AttributeError('User snapshots are read-only')
+
+    @property
+    def is_active(self):
+        return bool(self._values.get('is_active', True))
+
+    def __repr__(self):
+        return f'<UserSnapshot {self._values.get("username")}>'
+
+
+class UserCache:
+    """Per-process LRU/TTL cache of user snapshots for the Flask-Login user_loader
+
+    Entries are dropped when a session commits a change to the ``users``
+    table. Other gunicorn workers only see the change once the TTL expires.
+    """
+
+    def __init__(self, app=None, max_size=1024, ttl=30):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+        self._commits = CommitWatcher('users', self._invalidate_many, self.clear)
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Configure size and TTL from app config and hook session events"""
+        self.max_size = app.config.get('USER_CACHE_SIZE', self.max_size)
+        self.ttl = app.config.get('USER_CACHE_TTL', self.ttl)
+        app.extensions['user_cache'] = self
+        self._commits.listen()
+
+    def get(self, user_id):
+        """Return a snapshot for user_id, loading it from the database on a miss"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(user_id)
+                self._stats['hits'] += 1
+                return entry[1]
+            self._stats['misses'] += 1
+
+        from extensions import db
+        from models import User
+
+        user = db.session.get(User, user_id)
+        if user is None:
+            return None
+
+        snapshot = UserSnapshot({column.key: getattr(user, column.key) for column in User.__mapper__.column_attrs})
+        with self._lock:
+            self._entries[user_id] = (now + self.ttl, snapshot)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+        return snapshot
+
+    def invalidate(self, user_id):
+        """Drop a single user from the cache"""
+        with self._lock:
+            if self._entries.pop(user_id, None) is not None:
+                self._stats['invalidations'] += 1
+
+    def clear(self):
+        """Drop every cached user"""
+        with self._lock:
+            self._stats['invalidations'] += len(self._entries)
+            self._entries.clear()
+
+    def stats(self):
+        """Return a snapshot of the cache counters"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._entries)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
+
+    def _invalidate_many(self, user_ids):
+        for user_id in user_ids:
+            self.invalidate(user_id)
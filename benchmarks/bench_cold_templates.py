@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+First-request latency of a cold worker, with and without the Jinja bytecode cache
+
+Each trial starts a fresh Python process, as gunicorn does when it spawns
+or recycles a worker, creates the app and times the first request to a few
+template-heavy pages. Modes:
+
+  compile   no bytecode cache; every template is compiled from source
+  bytecode  JINJA_BYTECODE_CACHE filled by precompile-templates beforehand
+  preload   bytecode cache plus JINJA_PRELOAD_TEMPLATES (cost moves into create_app)
+
+The page cache is off so each request renders.
+
+Run from the project root: python benchmarks/bench_cold_templates.py [--trials 7]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+PAGES = ('/', '/marketing', '/software', '/webdev', '/services', '/about')
+MODES = ('compile', 'bytecode', 'preload')
+
+
+def child(mode, cache_dir):
+    """Runs in the fresh process: create the app and time the first request per page"""
+    import config
+
+    settings = {
+        'PAGE_CACHE_ENABLED': False,
+        'JINJA_BYTECODE_CACHE': None if mode == 'compile' else cache_dir,
+        'JINJA_PRELOAD_TEMPLATES': mode == 'preload',
+    }
+    config.config['bench'] = type('BenchConfig', (config.DevelopmentConfig,), settings)
+    from app import create_app
+    from extensions import request_metrics
+
+    imported = time.perf_counter()
+    app = create_app('bench')
+    created = time.perf_counter()
+    client = app.test_client()
+    timings = []
+    for page in PAGES:
+        t = time.perf_counter()
+        response = client.get(page)
+        timings.append(time.perf_counter() - t)
+        assert response.status_code == 200, (page, response.status_code)
+    request_metrics.reset()
+    print(json.dumps({
+        'create_app': created - imported,
+        'first': timings[0], 'pages': sum(timings),
+    }))
+
+
+def run(mode, cache_dir):
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', mode, cache_dir],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--trials', type=int, default=7, help='fresh processes per mode')
+    parser.add_argument('--child', nargs=2, metavar=('MODE', 'CACHE_DIR'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child)
+        return
+
+    cache_dir = tempfile.mkdtemp(prefix='aura-jinja-')
+    try:
+        # A first bytecode run fills the cache, like precompile-templates at deploy
+        run('bytecode', cache_dir)
+        print(f"{len(PAGES)} pages per worker, median of {args.trials} fresh processes\n")
+        print(f"{'mode':<9} {'create_app ms':>14} {'1st request ms':>15} {'all pages ms':>13}")
+        for mode in MODES:
+            results = [run(mode, cache_dir) for _ in range(args.trials)]
+
+            def median(key):
+                return statistics.median(result[key] for result in results) * 1000
+
+            print(f"{mode:<9} {median('create_app'):>14.1f} {median('first'):>15.1f} "
+                  f"{median('pages'):>13.1f}")
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
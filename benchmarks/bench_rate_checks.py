@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Rate check cost as security_logs grows
+
+Fills a scratch SQLite database with security_logs rows (spread over 30 days
+and 10,000 IPs, with the indexes from migrate_db.py) and times the old
+COUNT(*) in check_request_frequency against the rolling counter lookup.
+
+Run from the project root: python benchmarks/bench_rate_checks.py [--max-rows 10000000]
+"""
+
+import os
+import sys
+import time
+import random
+import sqlite3
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+from auth.counters import RollingCounters
+
+EVENT_TYPES = ['request_logged', 'login_attempt', 'suspicious_user_agent', 'suspicious_request_pattern']
+IPS = [f'10.{i // 250}.{i % 250}.7' for i in range(10000)]
+HOT_IP = IPS[42]
+
+LEGACY_COUNT = text(
+    "SELECT COUNT(*) FROM security_logs WHERE ip_address = :ip AND timestamp >= :start "
+    "AND event_type IN ('request_logged', 'login_attempt')"
+)
+
+
+def create_schema(conn):
+    conn.executescript("""
+        CREATE TABLE security_logs (
+            id INTEGER PRIMARY KEY, user_id INTEGER, event_type VARCHAR(50) NOT NULL,
+            ip_address VARCHAR(45), user_agent VARCHAR(500), timestamp DATETIME,
+            details TEXT, severity VARCHAR(20)
+        );
+        CREATE INDEX idx_security_logs_event_type ON security_logs(event_type);
+        CREATE INDEX idx_security_logs_timestamp ON security_logs(timestamp);
+        CREATE TABLE event_counters (
+            ip_address VARCHAR(45) NOT NULL, action VARCHAR(80) NOT NULL,
+            bucket INTEGER NOT NULL, count INTEGER NOT NULL,
+            PRIMARY KEY (ip_address, action, bucket)
+        );
+    """)
+
+
+def grow(conn, counters, now, rows):
+    """Append rows, keeping the last day's counters in step like the audit sink does"""
+    batch = []
+    increments = {}
+    cutoff = now - timedelta(seconds=counters.retention)
+    for _ in range(rows):
+        ip = HOT_IP if random.random() < 0.001 else random.choice(IPS)
+        event_type = random.choice(EVENT_TYPES)
+        timestamp = now - timedelta(seconds=random.random() * 30 * 86400)
+        batch.append((event_type, ip, 'bench', timestamp.strftime('%Y-%m-%d %H:%M:%S.%f'), 'info'))
+        if timestamp >= cutoff:
+            key = (ip, f'security_logs:{event_type}', counters.bucket_for(timestamp))
+            increments[key] = increments.get(key, 0) + 1
+    conn.executemany(
+        "INSERT INTO security_logs (event_type, ip_address, details, timestamp, severity) VALUES (?, ?, ?, ?, ?)",
+        batch,
+    )
+    conn.executemany(
+        "INSERT INTO event_counters VALUES (?, ?, ?, ?) "
+        "ON CONFLICT (ip_address, action, bucket) DO UPDATE SET count = count + excluded.count",
+        [(ip, action, bucket, count) for (ip, action, bucket), count in increments.items()],
+    )
+    conn.commit()
+
+
+def timed(func, repeat=200):
+    best = float('inf')
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        best = min(best, (time.perf_counter() - start) / repeat)
+    return best * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--max-rows', type=int, default=1000000)
+    args = parser.parse_args()
+
+    sizes = [n for n in (10000, 100000, 1000000, 10000000) if n <= args.max_rows]
+    counters = RollingCounters()
+    now = datetime.utcnow()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.db')
+        raw = sqlite3.connect(path)
+        create_schema(raw)
+        engine = create_engine(f'sqlite:///{path}')
+
+        print(f"{'rows':>10} {'COUNT(*)':>12} {'counters':>12}")
+        total = 0
+        for size in sizes:
+            while total < size:
+                step = min(size - total, 500000)
+                grow(raw, counters, now, step)
+                total += step
+            raw.execute("ANALYZE")
+            raw.commit()
+            with engine.connect() as conn:
+                start = (now - timedelta(minutes=15)).strftime('%Y-%m-%d %H:%M:%S.%f')
+                legacy_us = timed(lambda: conn.execute(LEGACY_COUNT, {'ip': HOT_IP, 'start': start}).scalar())
+                counter_us = timed(lambda: counters.count(
+                    HOT_IP, ['security_logs:request_logged', 'security_logs:login_attempt'], 15 * 60, session=conn
+                ))
+            print(f"{size:>10,} {legacy_us:>10.1f}us {counter_us:>10.1f}us")
+        raw.close()
+
+
+if __name__ == "__main__":
+    main()
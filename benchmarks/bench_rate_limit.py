@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Per-check overhead of the shared rate limiter
+
+Measures RateLimiter.is_limited() in one process, then with several
+processes hammering the same counter file the way gunicorn workers would,
+and checks that the combined count is exact across processes.
+
+Run from the project root: python benchmarks/bench_rate_limit.py
+"""
+
+import os
+import sys
+import time
+import tempfile
+import multiprocessing
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from auth.rate_limit import RateLimiter
+
+CHECKS = 20000
+
+
+def make_limiter(path, limit=10 ** 9):
+    limiter = RateLimiter(path=path)
+    limiter.limits = {'auth.login': [(limit, 60)]}
+    limiter.default_limits = [(limit, 3600), (limit, 86400)]
+    return limiter
+
+
+def run_checks(path, worker, results):
+    limiter = make_limiter(path)
+    start = time.perf_counter()
+    for i in range(CHECKS):
+        limiter.is_limited(f'10.{worker}.{i // 256 % 256}.{i % 256}', 'auth.login')
+    results.put((time.perf_counter() - start) / CHECKS * 1e6)
+
+
+def count_allowed(path, attempts, results):
+    limiter = make_limiter(path, limit=100)
+    results.put(sum(not limiter.is_limited('203.0.113.7', 'auth.login') for _ in range(attempts)))
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'ratelimit.bin')
+
+        results = multiprocessing.Queue()
+        run_checks(path, 0, results)
+        print(f"1 process:   {results.get():6.2f}us per check (3 counters each)")
+
+        print(f"CPUs: {os.cpu_count()}")
+        for workers in (3, 6):
+            procs = [multiprocessing.Process(target=run_checks, args=(path, w, results)) for w in range(workers)]
+            start = time.perf_counter()
+            for p in procs:
+                p.start()
+            timings = [results.get() for _ in procs]
+            for p in procs:
+                p.join()
+            wall_us = (time.perf_counter() - start) / (workers * CHECKS) * 1e6
+            print(f"{workers} processes: {wall_us:6.2f}us wall time per check overall, "
+                  f"{max(timings):6.2f}us worst per-worker latency")
+
+        make_limiter(path).reset()
+        procs = [multiprocessing.Process(target=count_allowed, args=(path, 80, results)) for _ in range(3)]
+        for p in procs:
+            p.start()
+        allowed = sum(results.get() for _ in procs)
+        for p in procs:
+            p.join()
+        print(f"3 processes x 80 attempts against a limit of 100: {allowed} allowed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Write throughput and tail latency under concurrency, default engine vs SQLite profile
+
+Mimics gunicorn's gthread workers: several processes, each with a handful
+of threads, commit small transactions (an INSERT like the contact form or
+audit sink) while other threads run the kind of SELECTs page views make.
+It runs once with SQLAlchemy's default SQLite engine (rollback journal,
+deferred transactions) and once with auth/database.py's profile (WAL,
+synchronous=NORMAL, a single queued writer per process, BEGIN IMMEDIATE
+with retry, read-only reader pool), each on a fresh scratch database.
+
+Run from the project root: python benchmarks/bench_sqlite_writes.py [--processes 3 --threads 4]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import multiprocessing
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+from auth.database import writer_options, reader_engine
+
+INSERT = text(
+    "INSERT INTO messages (name, email, message, created_at) VALUES (:name, :email, :message, :created_at)"
+)
+READ = text("SELECT COUNT(*), MAX(id) FROM (SELECT id FROM messages ORDER BY id DESC LIMIT 500)")
+SCAN = text("SELECT email, COUNT(*) FROM messages GROUP BY email ORDER BY 2 DESC LIMIT 5")
+
+
+def create_schema(path):
+    engine = create_engine(f'sqlite:///{path}')
+    with engine.begin() as connection:
+        connection.exec_driver_sql(
+            "CREATE TABLE messages (id INTEGER PRIMARY KEY, name VARCHAR(100), email VARCHAR(120), "
+            "message TEXT, created_at DATETIME)"
+        )
+        connection.execute(INSERT, [
+            {'name': 'seed', 'email': f'user{n % 500}@example.com', 'message': 'x' * 200, 'created_at': datetime.utcnow()}
+            for n in range(50000)
+        ])
+    engine.dispose()
+
+
+def engines(mode, path):
+    if mode == 'default':
+        engine = create_engine(f'sqlite:///{path}')
+        return engine, engine
+    return create_engine(f'sqlite:///{path}', **writer_options()), reader_engine(path)
+
+
+def worker(mode, path, threads, writes, reads, results):
+    writer, reader = engines(mode, path)
+
+    def write(n):
+        start = time.perf_counter()
+        try:
+            with writer.begin() as connection:
+                connection.execute(INSERT, {
+                    'name': f'p{os.getpid()}', 'email': f'user{n % 500}@example.com',
+                    'message': 'hello ' * 40, 'created_at': datetime.utcnow(),
+                })
+            return time.perf_counter() - start, None
+        except Exception as e:
+            return time.perf_counter() - start, type(e).__name__
+
+    def read(n):
+        with reader.connect() as connection:
+            connection.execute(SCAN if n % 10 == 0 else READ).all()
+
+    with ThreadPoolExecutor(threads) as pool:
+        read_jobs = [pool.submit(read, n) for n in range(reads)]
+        outcomes = list(pool.map(write, range(writes)))
+        for job in read_jobs:
+            job.result()
+    results.put(outcomes)
+    writer.dispose()
+    reader.dispose()
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def run(mode, args):
+    directory = tempfile.mkdtemp(prefix='aura-bench-')
+    path = os.path.join(directory, 'bench.db')
+    create_schema(path)
+
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=worker, args=(mode, path, args.threads, args.writes, args.reads, results))
+        for _ in range(args.processes)
+    ]
+    start = time.perf_counter()
+    for process in processes:
+        process.start()
+    outcomes = [outcome for _ in processes for outcome in results.get()]
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - start
+
+    latencies = [latency for latency, error in outcomes if error is None]
+    errors = [error for _, error in outcomes if error is not None]
+    print(f"{mode:<8} {len(latencies) / elapsed:>9.0f} {percentile(latencies, 0.5) * 1000:>8.1f} "
+          f"{percentile(latencies, 0.95) * 1000:>8.1f} {percentile(latencies, 0.99) * 1000:>8.1f} "
+          f"{max(latencies) * 1000:>9.1f} {len(errors):>7}")
+    for name in sorted(set(errors)):
+        print(f"{'':<8} {errors.count(name)} x {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--processes', type=int, default=3, help='worker processes (default: 3, like the Procfile)')
+    parser.add_argument('--threads', type=int, default=4, help='threads per process')
+    parser.add_argument('--writes', type=int, default=500, help='write transactions per process')
+    parser.add_argument('--reads', type=int, default=500, help='read queries per process, interleaved')
+    args = parser.parse_args()
+
+    print(f"{args.processes} processes x {args.threads} threads, {args.writes} writes + {args.reads} reads each\n")
+    print(f"{'engine':<8} {'writes/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>9} {'errors':>7}")
+    for mode in ('default', 'profile'):
+        run(mode, args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Import-time profile of wsgi:app and fork-to-first-response time with and without preload
+
+The profile runs ``python -X importtime -c "import wsgi"`` and sums each
+module's own import time by top-level package, which shows what a worker
+pays before it can serve anything.
+
+The startup part forks the way the gunicorn master does and times from
+fork() to the end of the child's first response (GET /):
+
+  fresh    the child imports wsgi and creates the app itself (no preload)
+  preload  the parent already holds the app; the child only runs post_fork
+
+Run from the project root: python benchmarks/bench_worker_startup.py [--trials 5]
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# wsgi:app runs with ProductionConfig, which refuses to start without a SECRET_KEY
+os.environ.setdefault('SECRET_KEY', 'benchmark-only-secret')
+
+
+def import_profile(top):
+    stderr = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import wsgi'],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    ).stderr
+    packages = defaultdict(int)
+    total = 0
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        own, _, name = line[len('import time:'):].split('|')
+        packages[name.strip().split('.')[0]] += int(own)
+        total += int(own)
+
+    print(f"Import profile of wsgi:app: {total / 1000:.0f} ms in total, by package (own time)\n")
+    for name, micros in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+        print(f"   {name:<24} {micros / 1000:>8.1f} ms")
+    print()
+
+
+def first_response(preloaded):
+    """Seconds from fork() to the child's first response"""
+    read_end, write_end = os.pipe()
+    start = time.perf_counter()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_end)
+        try:
+            if preloaded:
+                from wsgi import app
+                from extensions import sqlite_profile
+
+                with app.app_context():
+                    sqlite_profile.after_fork()
+            else:
+                from wsgi import app
+            response = app.test_client().get('/')
+            assert response.status_code == 200, response.status_code
+            os.write(write_end, repr(time.perf_counter() - start).encode())
+        finally:
+            os._exit(0)
+    os.close(write_end)
+    with os.fdopen(read_end) as pipe:
+        elapsed = pipe.read()
+    os.waitpid(pid, 0)
+    return float(elapsed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--trials', type=int, default=5, help='forks per mode')
+    parser.add_argument('--top', type=int, default=12, help='packages to list in the import profile')
+    args = parser.parse_args()
+
+    import_profile(args.top)
+
+    # Fresh forks must come first, while this process hasn't imported the app
+    fresh = [first_response(preloaded=False) for _ in range(args.trials)]
+    start = time.perf_counter()
+    from wsgi import app  # noqa: F401  (what preload_app does in the master)
+    preload_cost = time.perf_counter() - start
+    preloaded = [first_response(preloaded=True) for _ in range(args.trials)]
+
+    print(f"Fork to first response (GET /), median of {args.trials}\n")
+    print(f"   {'fresh':<8} {statistics.median(fresh) * 1000:>8.1f} ms")
+    print(f"   {'preload':<8} {statistics.median(preloaded) * 1000:>8.1f} ms"
+          f"   (after {preload_cost * 1000:.0f} ms once in the master)")
+
+    from extensions import request_metrics
+    request_metrics.reset()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Script to fingerprint and precompress static assets before a deploy
+"""
+
+import argparse
+from app import create_app
+from extensions import static_assets
+from web import assets
+
+
+def main():
+    """Hash every file under static/ into the asset manifest"""
+    parser = argparse.ArgumentParser(description='Build fingerprinted, precompressed static assets')
+    parser.add_argument('--prune', action='store_true',
+                        help='delete hashed files from earlier builds (only once no old pages are cached)')
+    args = parser.parse_args()
+
+    app = create_app()
+    print("📦 Aura Static Assets")
+    print("=" * 40)
+    files, original, smallest = static_assets.build(prune=args.prune)
+    print(f"   ✅ {files} files hashed into {static_assets.asset_dir}/manifest.json")
+    print(f"   🗜️  {original / 1024:.1f} KB -> {smallest / 1024:.1f} KB for clients accepting "
+          f"{'br' if assets.brotli else 'gzip'}")
+    if assets.brotli is None:
+        print("   ⚠️  brotli is not installed; only .gz siblings were written (pip install Brotli)")
+    print("\nRestart the workers to pick up the new manifest.")
+
+
+if __name__ == "__main__":
+    main()
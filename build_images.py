@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Script to build resized and WebP variants of static and event images
+"""
+
+import os
+import argparse
+from app import create_app
+from extensions import db, image_pipeline
+from models import Event
+
+
+def sources(app):
+    """Raster images under static/img plus every image an event points at"""
+    found = set()
+    variant_dir = os.path.join(app.static_folder, image_pipeline.variant_dir)
+    for directory, subdirs, files in os.walk(os.path.join(app.static_folder, 'img')):
+        subdirs[:] = [name for name in subdirs if os.path.join(directory, name) != variant_dir]
+        for name in files:
+            relative = os.path.relpath(os.path.join(directory, name), app.static_folder).replace(os.sep, '/')
+            if image_pipeline.is_raster(relative):
+                found.add(relative)
+    with app.app_context():
+        for image, in db.session.query(Event.image).filter(Event.image.isnot(None)).distinct():
+            source = image_pipeline.normalize(image)
+            if source and image_pipeline.is_raster(source):
+                found.add(source)
+    return sorted(found)
+
+
+def main():
+    """Build variants for every image that doesn't have them yet"""
+    parser = argparse.ArgumentParser(description='Build responsive image variants')
+    parser.add_argument('images', nargs='*', help='paths under static/ (default: static/img and all event images)')
+    parser.add_argument('--force', action='store_true', help='rebuild variants that already exist')
+    args = parser.parse_args()
+
+    app = create_app()
+    print("🖼️  Aura Image Variants")
+    print("=" * 40)
+
+    before = after = 0
+    for source in args.images or sources(app):
+        try:
+            entry = image_pipeline.generate(source, force=args.force)
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            return
+        except (OSError, ValueError) as e:
+            print(f"   ⚠️  {source}: {e}")
+            continue
+        original = os.path.getsize(os.path.join(app.static_folder, source))
+        webp = [v for v in entry['variants'] if v['type'] == 'image/webp']
+        largest = os.path.getsize(os.path.join(app.static_folder, webp[-1]['file']))
+        before += original
+        after += largest
+        print(f"   ✅ {source:<40} {entry['width']}x{entry['height']:<6} {original / 1024:>8.1f} KB -> "
+              f"{largest / 1024:>7.1f} KB WebP @ {webp[-1]['width']}w, {len(entry['variants'])} variants")
+
+    if before:
+        print(f"\n📉 Largest WebP variants total {after / 1024:.1f} KB vs {before / 1024:.1f} KB of originals")
+
+
+if __name__ == "__main__":
+    main()
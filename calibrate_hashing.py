@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Script to calibrate the password hashing cost on the deployment host
+"""
+
+import argparse
+import os
+from auth.hashing import calibrate, save_calibration, CALIBRATION_FILE
+
+
+def main():
+    """Benchmark the hash schemes and save the method that fits the budget"""
+    parser = argparse.ArgumentParser(description='Calibrate password hashing cost')
+    parser.add_argument('--target-ms', type=float, default=250.0,
+                        help='verify latency budget per login in milliseconds (default: 250)')
+    parser.add_argument('--scheme', choices=['pbkdf2', 'bcrypt'], default='pbkdf2',
+                        help='hash scheme to calibrate (default: pbkdf2)')
+    parser.add_argument('--samples', type=int, default=5,
+                        help='verify runs per candidate (default: 5)')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='print the result without saving it')
+    args = parser.parse_args()
+
+    print("⏱️  Aura Password Hash Calibration")
+    print("=" * 40)
+    print(f"Scheme: {args.scheme}, budget: {args.target_ms:.0f}ms per verify\n")
+
+    try:
+        result = calibrate(args.target_ms, scheme=args.scheme, samples=args.samples)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
+
+    for measurement in result['measurements']:
+        marker = "✅" if measurement['verify_ms'] <= args.target_ms else "❌"
+        print(f"   {marker} {measurement['method']:<28} {measurement['verify_ms']:>8.1f}ms")
+
+    print()
+    if result['within_budget']:
+        print(f"👉 Selected {result['method']} ({result['verify_ms']:.1f}ms)")
+    else:
+        print(f"⚠️  Nothing fits the budget, falling back to {result['method']} ({result['verify_ms']:.1f}ms)")
+
+    if args.dry_run:
+        return
+
+    save_calibration('instance', result)
+    print(f"💾 Saved to {os.path.join('instance', CALIBRATION_FILE)}")
+    print("   Existing hashes are upgraded the next time each user logs in.")
+
+
+if __name__ == "__main__":
+    main()
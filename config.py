@@ -11,6 +11,20 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///aura.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # SQLite engine profile (auth/database.py); ignored for other databases
+    SQLITE_PRAGMAS = {}  # Overrides for DEFAULT_PRAGMAS: WAL, synchronous=NORMAL, busy_timeout, mmap_size, cache_size
+    SQLITE_READ_ONLY_CONNECTIONS = True  # Send db.session reads to a read-only connection pool
+    SQLITE_READER_POOL_SIZE = 5
+    SQLITE_WRITER_TIMEOUT = 30  # Seconds a thread waits for its process's single writer connection
+    SQLITE_WRITE_RETRIES = 5  # Retries when the write lock is still busy after busy_timeout
+    SQLITE_WRITE_BACKOFF = 0.05  # Seconds; doubles per retry, with jitter
+    
+    # Audit tables (security_logs, login_attempts and their counters/rollups) on the 'audit' bind
+    AUDIT_DATABASE_URI = os.environ.get('AUDIT_DATABASE_URL')  # e.g. sqlite:///audit.db; unset keeps them in the main file
+    AUDIT_SQLITE_PRAGMAS = {}  # Overrides SQLITE_PRAGMAS for a separate audit file
+    AUDIT_CHECKPOINT_INTERVAL = 30  # Seconds between background WAL checkpoints of a separate audit file
+    # Schema: flask db upgrade, then flask db upgrade --directory migrations/audit
+    
     # Security Configuration
     WTF_CSRF_ENABLED = True
     WTF_CSRF_TIME_LIMIT = 3600  # 1 hour
@@ -24,8 +38,21 @@ class Config:
     # Password Security
     PASSWORD_MIN_LENGTH = 12
     PASSWORD_EXPIRY_DAYS = 90
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD')  # Falls back to instance/password_hashing.json
+    PASSWORD_HASH_WORKERS = None  # Defaults to the number of CPU cores
+    PASSWORD_HASH_QUEUE_SIZE = None  # Defaults to 4 pending jobs per worker
+    PASSWORD_HASH_TIMEOUT = 5.0  # Seconds
+    
+    # Rate Limiting - counters live in a memory-mapped file shared by all workers
+    RATE_LIMITS = {
+        'auth.login': '5 per minute',
+        'auth.register': '3 per hour',
+        'auth.password_reset_request': '3 per hour',
+    }
+    RATE_LIMIT_SHARED = '50 per hour; 200 per day'  # Per IP across all limited endpoints
+    RATE_LIMIT_FILE = None  # Defaults to instance/ratelimit.bin
+    RATE_LIMIT_SLOTS = 65536
     
-    # Rate Limiting - Fixed to use proper storage
     RATELIMIT_DEFAULT = "200 per day"
     RATELIMIT_STORAGE_URL = "redis://localhost:6379"  # Use Redis in production
     RATELIMIT_STORAGE_OPTIONS = {
@@ -34,6 +61,40 @@ class Config:
         'socket_timeout': 5,
     }
     
+    # Flask-Login user_loader cache (per worker process)
+    USER_CACHE_SIZE = 1024
+    USER_CACHE_TTL = 30  # Seconds a change made in another worker may go unseen
+    
+    # Public events page
+    EVENTS_PER_PAGE = 12
+    EVENTS_COUNT_LIMIT = 1000  # Filtered event counts stop here and show as "1000+"
+    EVENT_CACHE_SIZE = 512  # Event detail lookups kept per worker process
+    EVENT_CACHE_TTL = 300  # Seconds an edit made in another worker may go unseen
+    
+    # Responsive images, built by build_images.py or on upload (needs Pillow)
+    IMAGE_WIDTHS = (320, 640, 960, 1280, 1920)  # Variant widths; never wider than the source
+    IMAGE_QUALITY = 80  # WebP and JPEG encoder quality
+    IMAGE_VARIANT_DIR = 'img/variants'  # Under the static folder
+    IMAGE_UPLOAD_DIR = 'uploads'  # Under the static folder
+    
+    # Fingerprinted static assets, built by build_assets.py
+    ASSET_DIR = 'dist'  # Under the static folder; holds the hashed copies and manifest.json
+    ASSET_FINGERPRINTS = None  # Hashed URLs and immutable caching; defaults to off in debug
+    
+    # Rendered marketing pages, cached per worker process
+    PAGE_CACHE_ENABLED = None  # Defaults to off in debug
+    PAGE_CACHE_SIZE = 256  # Pages kept; one per endpoint and login state
+    PAGE_CACHE_CHECK_INTERVAL = 5  # Seconds between checks for changed templates
+    PAGE_CACHE_VERSION = os.environ.get('RELEASE_VERSION')  # Bump on deploy to drop cached pages
+    
+    # Static export of the public pages (flask export-static)
+    STATIC_EXPORT_DIR = None  # Defaults to instance/site
+    STATIC_EXPORT_BLUEPRINTS = ('main', 'events')  # Only blueprints create_app registers
+    
+    # Compiled templates (flask precompile-templates fills the cache at deploy)
+    JINJA_BYTECODE_CACHE = 'jinja_cache'  # Directory, relative to instance/; None compiles in memory only
+    JINJA_PRELOAD_TEMPLATES = False  # Load every template when the app is created
+    
     # Account Security
     MAX_LOGIN_ATTEMPTS = 5
     ACCOUNT_LOCKOUT_DURATION = timedelta(minutes=30)
@@ -53,6 +114,43 @@ class Config:
         'Content-Security-Policy': "default-src 'self'; script-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net https://cdnjs.cloudflare.com; style-src 'self' 'unsafe-inline' https://cdn.jsdelivr.net https://cdnjs.cloudflare.com; font-src 'self' https://cdnjs.cloudflare.com; img-src 'self' data: https:;"
     }
     
+    # Audit log buffering (SecurityLog and LoginAttempt rows)
+    AUDIT_QUEUE_SIZE = 10000
+    AUDIT_BATCH_SIZE = 200
+    AUDIT_FLUSH_INTERVAL = 1.0  # Seconds
+    AUDIT_OVERFLOW_POLICY = 'drop_oldest'  # or 'sample'
+    AUDIT_SAMPLE_RATE = 0.1  # Fraction of rows kept when full under 'sample'
+    
+    # Rolling per-IP event counters used by the rate checks
+    EVENT_COUNTER_BUCKET_SECONDS = 60
+    EVENT_COUNTER_RETENTION = 86400  # Seconds; must cover the longest check window
+    
+    # Retention for security_logs and login_attempts (python archive_logs.py run)
+    LOG_RETENTION_DAYS = 90
+    LOG_ARCHIVE_DIR = None  # Defaults to instance/archive
+    LOG_ARCHIVE_BATCH_SIZE = 1000  # Rows per DELETE transaction
+    
+    # Hourly rollups behind the dashboard charts
+    ROLLUP_BATCH_ROWS = 50000  # Log ids counted per transaction
+    ROLLUP_DASHBOARD_BATCHES = 4  # Batches per source a dashboard load may catch up
+    
+    # Request metrics, one file per worker, served at /admin/metrics
+    METRICS_DIR = None  # Defaults to instance/metrics; clear it when deploying
+    METRICS_MAX_SERIES = 1024  # (endpoint, status) pairs per worker
+    
+    # Admin views
+    ADMIN_USERS_PER_PAGE = 25
+    ADMIN_SEARCH_COUNT_LIMIT = 1000  # Filtered user counts stop here and show as "1000+"
+    ADMIN_LOGS_PER_PAGE = 50
+    ADMIN_LOGS_COUNT_LIMIT = 10000  # Log viewer totals stop here and show as "10000+"
+    EXPORT_CHUNK_SIZE = 1000  # Rows per query when streaming /admin/export downloads
+    
+    # Per-request SQL profiling
+    SLOW_QUERY_THRESHOLD = 0.1  # Seconds
+    SLOW_QUERY_LOG = None  # File for slow query and N+1 reports; app log handlers if unset
+    QUERY_REPEAT_THRESHOLD = 5  # Identical statements per request before flagging N+1
+    QUERY_PROFILER_HEADER = None  # Send X-DB-Queries; defaults to on in debug
+    
     # Logging Configuration
     LOG_LEVEL = 'INFO'
     LOG_FILE = 'logs/aura.log'
@@ -72,6 +170,10 @@ class Config:
     # IP Whitelist/Blacklist (for additional security)
     ALLOWED_IPS = os.environ.get('ALLOWED_IPS', '').split(',') if os.environ.get('ALLOWED_IPS') else []
     BLOCKED_IPS = os.environ.get('BLOCKED_IPS', '').split(',') if os.environ.get('BLOCKED_IPS') else []
+    # Entries are addresses or CIDR ranges; allowlisted IPs are never blocked or rate limited
+    BLOCKED_IPS_FILE = os.environ.get('BLOCKED_IPS_FILE')  # Defaults to instance/blocked_ips.txt
+    ALLOWED_IPS_FILE = os.environ.get('ALLOWED_IPS_FILE')  # Defaults to instance/allowed_ips.txt
+    IP_LIST_CHECK_INTERVAL = 5.0  # Seconds between checks for changed list files
     
     # Suspicious Activity Detection
     SUSPICIOUS_ACTIVITY_THRESHOLD = 10
@@ -81,7 +183,7 @@ class Config:
 class DevelopmentConfig(Config):
     """Development configuration"""
     DEBUG = True
-    SQLALCHEMY_ECHO = True
+    SQLALCHEMY_ECHO = os.environ.get('SQLALCHEMY_ECHO', '').lower() in ['true', 'on', '1']
     SESSION_COOKIE_SECURE = False
     
     # Use memory storage for development (no Redis required)
@@ -98,7 +200,8 @@ class ProductionConfig(Config):
     
     # Use environment variables for sensitive data
     SECRET_KEY = os.environ.get('SECRET_KEY')
-    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL')
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or Config.SQLALCHEMY_DATABASE_URI
+    JINJA_PRELOAD_TEMPLATES = True
     
     # Enhanced security for production
     WTF_CSRF_TIME_LIMIT = 1800  # 30 minutes
@@ -127,7 +230,7 @@ class TestingConfig(Config):
 # Configuration dictionary
 config = {
     'development': DevelopmentConfig,
-    'production': TestingConfig,
+    'production': ProductionConfig,
     'testing': TestingConfig,
     'default': DevelopmentConfig
 }
@@ -5,7 +5,7 @@ Script to create an admin user in the Aura database
 
 import sqlite3
 import os
-from werkzeug.security import generate_password_hash
+from extensions import password_hasher
 
 def create_admin_user(email, username, password, is_super_admin=True):
     """Create an admin user in the database"""
@@ -17,6 +17,9 @@ def create_admin_user(email, username, password, is_super_admin=True):
         print(f"❌ Database not found at {db_path}")
         return False
     
+    # Hash with the method picked by calibrate_hashing.py, if it has been run
+    password_hasher.use_calibration('instance')
+    
     try:
         # Connect to database
         conn = sqlite3.connect(db_path)
@@ -53,7 +56,7 @@ def create_admin_user(email, username, password, is_super_admin=True):
         print("🆕 Creating new admin user...")
         
         # Generate password hash
-        password_hash = generate_password_hash(password, method='pbkdf2:sha256:600000')
+        password_hash = password_hasher.hash(password)
         
         # Insert new admin user
         cursor.execute("""
@@ -0,0 +1,85 @@
+import time
+import threading
+from collections import OrderedDict
+from invalidation import CommitWatcher
+
+
+class EventCache:
+    """Per-process LRU/TTL cache for event detail lookups and the category list
+
+    Details are plain dicts of column values, so they are safe to share
+    between requests; unknown ids are cached as misses too. Entries are
+    dropped when a session commits a change to an event, and other workers
+    catch up once the TTL expires.
+    """
+
+    def __init__(self, app=None, max_size=512, ttl=300):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._categories = None
+        self._lock = threading.Lock()
+        self._commits = CommitWatcher('events', self._invalidate, self.clear)
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Configure size and TTL from app config and hook session events"""
+        self.max_size = app.config.get('EVENT_CACHE_SIZE', self.max_size)
+        self.ttl = app.config.get('EVENT_CACHE_TTL', self.ttl)
+        app.extensions['event_cache'] = self
+        self._commits.listen()
+
+    def get(self, event_id):
+        """Return the event's column values as a dict, or None if there is no such event"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(event_id)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(event_id)
+                return entry[1]
+
+        from extensions import db
+        from models import Event
+
+        row = db.session.get(Event, event_id)
+        values = None if row is None else {
+            column.key: getattr(row, column.key) for column in Event.__mapper__.column_attrs
+        }
+        with self._lock:
+            self._entries[event_id] = (now + self.ttl, values)
+            self._entries.move_to_end(event_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return values
+
+    def categories(self):
+        """Sorted distinct event categories, for the filter menu"""
+        now = time.monotonic()
+        with self._lock:
+            if self._categories is not None and self._categories[0] > now:
+                return self._categories[1]
+
+        from extensions import db
+        from models import Event
+
+        # Walks ix_events_category_date rather than the table
+        rows = db.session.query(Event.category).filter(Event.category.isnot(None)).distinct().order_by(Event.category)
+        categories = [category for category, in rows]
+        with self._lock:
+            self._categories = (now + self.ttl, categories)
+        return categories
+
+    def clear(self):
+        """Drop every cached event and the category list"""
+        with self._lock:
+            self._entries.clear()
+            self._categories = None
+
+    def _invalidate(self, event_ids):
+        with self._lock:
+            for event_id in event_ids:
+                self._entries.pop(event_id, None)
+            # A new or recategorized event can change the menu
+            self._categories = None
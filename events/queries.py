@@ -0,0 +1,32 @@
+from datetime import datetime, timedelta
+from models import Event
+from pagination import Keyset
+
+
+def parse_date(value, end=False):
+    """Parse a date or datetime-local form value; a bare end date includes that whole day"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if end and len(value) == 10:
+        parsed += timedelta(days=1)
+    return parsed
+
+
+def event_keyset(category=None, start=None, end=None):
+    """Keyset over events, latest date first, narrowed by category and date range
+
+    With a category, ix_events_category_date serves both the filter and
+    the (date, id) order; without one, ix_events_date does.
+    """
+    query = Event.query
+    if category:
+        query = query.filter(Event.category == category)
+    if start is not None:
+        query = query.filter(Event.date >= start)
+    if end is not None:
+        query = query.filter(Event.date < end)
+    return Keyset(query, [Event.date, Event.id], descending=True)
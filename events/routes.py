@@ -1,11 +1,15 @@
-from flask import Blueprint, render_template
+from flask import Blueprint, render_template, redirect, url_for, abort
+from extensions import event_cache
 
 bp = Blueprint('events', __name__, template_folder='../templates')
 
 @bp.route('/')
 def events():
-    return render_template('events.html', title="Events")
+    return redirect(url_for('main.events'))
 
 @bp.route('/<int:event_id>')
 def event_detail(event_id):
-    return render_template('event_detail.html', event_id=event_id, title="Event Details")
+    event = event_cache.get(event_id)
+    if event is None:
+        abort(404)
+    return render_template('event_detail.html', event=event, title=event['title'])
@@ -1,11 +1,40 @@
 # extensions.py
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
+from auth.audit import AuditSink
+from auth.counters import RollingCounters
+from auth.database import RoutingSession, SQLiteProfile
+from auth.hashing import PasswordHasher
+from auth.ip_index import IPAccessList
+from auth.metrics import RequestMetrics
+from auth.query_profiler import QueryProfiler
+from auth.rate_limit import RateLimiter
+from auth.rollups import HourlyRollups
+from auth.user_cache import UserCache
+from events.cache import EventCache
+from web.assets import StaticAssets
+from web.images import ImagePipeline
+from web.page_cache import PageCache
+from web.template_cache import TemplateCache
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+sqlite_profile = SQLiteProfile()
 login_manager = LoginManager()
+password_hasher = PasswordHasher()
+user_cache = UserCache()
+audit_sink = AuditSink()
+rate_limiter = RateLimiter()
+rolling_counters = RollingCounters()
+ip_access_list = IPAccessList()
+request_metrics = RequestMetrics()
+query_profiler = QueryProfiler()
+hourly_rollups = HourlyRollups()
+event_cache = EventCache()
+image_pipeline = ImagePipeline()
+static_assets = StaticAssets()
+page_cache = PageCache()
+template_cache = TemplateCache()
 
 @login_manager.user_loader
 def load_user(user_id):
-    from models import User
-    return User.query.get(int(user_id))
+    return user_cache.get(int(user_id))
@@ -0,0 +1,47 @@
+"""
+Gunicorn settings, picked up automatically from the project root
+
+The app is created once in the master (preload_app) and forked into the
+workers, so imports, template loading and create_app run once per deploy
+instead of once per worker, and the forked workers share those pages
+copy-on-write. Anything holding connections or threads must not cross the
+fork: SQLAlchemy pools are reset in post_fork, and the audit sink, rate
+limiter, request metrics and WAL checkpointer already start per process.
+
+Workers are recycled after max_requests (plus jitter, so they don't all
+restart at once); with preload a replacement worker is just a fork. The
+request metrics file of each exited worker is folded into one total.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 3))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 1))
+timeout = 120
+
+# Exported in the master before the app is preloaded; SECRET_KEY must also be set
+raw_env = [f"FLASK_CONFIG={os.environ.get('FLASK_CONFIG', 'production')}"]
+
+preload_app = True
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+
+def post_fork(server, worker):
+    """Give the new worker its own SQLAlchemy connection pools"""
+    from wsgi import app
+    from extensions import sqlite_profile
+
+    with app.app_context():
+        sqlite_profile.after_fork()
+
+
+def child_exit(server, worker):
+    """Fold the exited worker's request metrics into the running total"""
+    from wsgi import app
+    from extensions import request_metrics
+
+    with app.app_context():
+        request_metrics.merge_exited()
@@ -0,0 +1,51 @@
+# invalidation.py
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+class CommitWatcher:
+    """Reports which rows of one table each session commits changes to
+
+    Ids of rows inserted, updated or deleted by a flush are collected in
+    ``session.info`` and handed to ``on_change`` as a set once the session
+    commits; a rollback discards them. Bulk UPDATE/DELETE statements bypass
+    the flush, so they call ``on_clear`` instead. Used by the per-process
+    caches to drop entries their own worker has made stale.
+    """
+
+    def __init__(self, tablename, on_change, on_clear):
+        self.tablename = tablename
+        self.on_change = on_change
+        self.on_clear = on_clear
+        self._changed_key = f'{tablename}_changed'
+        self._clear_key = f'{tablename}_clear'
+
+    def listen(self):
+        """Hook the session events, once however often the owning extension is initialized"""
+        if not event.contains(Session, 'after_flush', self._after_flush):
+            event.listen(Session, 'after_flush', self._after_flush)
+            event.listen(Session, 'do_orm_execute', self._on_execute)
+            event.listen(Session, 'after_commit', self._after_commit)
+            event.listen(Session, 'after_rollback', self._after_rollback)
+
+    def _after_flush(self, session, flush_context):
+        changed = session.info.setdefault(self._changed_key, set())
+        for obj in (*session.new, *session.dirty, *session.deleted):
+            if getattr(obj, '__tablename__', None) == self.tablename and obj.id is not None:
+                changed.add(obj.id)
+
+    def _on_execute(self, orm_execute_state):
+        if orm_execute_state.is_update or orm_execute_state.is_delete:
+            if any(mapper.local_table.name == self.tablename for mapper in orm_execute_state.all_mappers):
+                orm_execute_state.session.info[self._clear_key] = True
+
+    def _after_commit(self, session):
+        changed = session.info.pop(self._changed_key, None)
+        if session.info.pop(self._clear_key, False):
+            self.on_clear()
+        elif changed:
+            self.on_change(changed)
+
+    def _after_rollback(self, session):
+        session.info.pop(self._changed_key, None)
+        session.info.pop(self._clear_key, None)
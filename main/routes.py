@@ -1,15 +1,18 @@
 # main/routes.py
-from flask import Blueprint, render_template,request, redirect, url_for, flash
-from models import ContactMessage, CareerApplication, Event
-from extensions import db
+from flask import Blueprint, render_template,request, redirect, url_for, flash, current_app, make_response
+from models import ContactMessage, CareerApplication
+from extensions import db, event_cache, page_cache
+from events.queries import event_keyset, parse_date
 
 bp = Blueprint('main', __name__, template_folder='../templates')
 
 @bp.route('/')
+@page_cache.cached
 def index():
     return render_template("index.html", title="Aura — One Company. Three Superpowers.")
 
 @bp.route('/about')
+@page_cache.cached
 def about():
     return render_template("about.html", title="About Us")
 
@@ -38,46 +41,76 @@ def contact():
 
 @bp.route('/events')
 def events():
-    events = Event.query.all()
-    return render_template("events.html", events=events)
+    filters = {
+        'category': request.args.get('category', '').strip(),
+        'start': request.args.get('start', ''),
+        'end': request.args.get('end', ''),
+    }
+    events = event_keyset(
+        filters['category'], parse_date(filters['start']), parse_date(filters['end'], end=True)
+    ).paginate(
+        page=request.args.get('page', 1, type=int),
+        per_page=current_app.config.get('EVENTS_PER_PAGE', 12),
+        after=request.args.get('after'),
+        before=request.args.get('before'),
+        args=filters,
+        count_limit=current_app.config.get('EVENTS_COUNT_LIMIT', 1000),
+    )
+    return render_template("events.html", events=events, categories=event_cache.categories(), **filters)
 
 @bp.route('/webdev')
+@page_cache.cached
 def webdev():
     return render_template("webdev.html", title="Web Development")
 
 @bp.route('/software')
+@page_cache.cached
 def software():
     return render_template("software.html", title="Software Development")
 
 @bp.route('/marketing')
+@page_cache.cached
 def marketing():
     return render_template("marketing.html", title="Marketing Services")
 
 # Digital Marketing Specific Routes
 @bp.route('/seo')
+@page_cache.cached
 def seo():
     return render_template("seo.html", title="SEO Services")
 
 @bp.route('/social-media')
+@page_cache.cached
 def social_media():
     return render_template("social_media.html", title="Social Media Marketing")
 
 @bp.route('/ppc')
+@page_cache.cached
 def ppc():
     return render_template("ppc.html", title="PPC & Google Ads")
 
 @bp.route('/content-marketing')
+@page_cache.cached
 def content_marketing():
     return render_template("content_marketing.html", title="Content Marketing")
 
 @bp.route('/marketing-analytics')
+@page_cache.cached
 def marketing_analytics():
     return render_template("marketing_analytics.html", title="Marketing Analytics")
 
 @bp.route('/services')
+@page_cache.cached
 def services():
     return render_template("services.html", title="Our Services")
 
+@bp.route('/navbar-auth')
+def navbar_auth():
+    """Login-dependent navbar items, fetched by statically exported pages"""
+    response = make_response(render_template('navbar_auth.html'))
+    response.headers['Cache-Control'] = 'private, no-store'
+    return response
+
 @bp.route('/career', methods=['GET', 'POST'])
 def career():
     if request.method == "POST":
@@ -0,0 +1,93 @@
+import logging
+from logging.config import fileConfig
+
+from flask import current_app
+
+from alembic import context
+
+# this is the Alembic Config object, which provides
+# access to the values within the .ini file in use.
+config = context.config
+
+# Interpret the config file for Python logging.
+# This line sets up loggers basically.
+fileConfig(config.config_file_name)
+logger = logging.getLogger('alembic.env')
+
+VERSION_TABLE = 'alembic_version_audit'
+
+
+def get_engine():
+    # The audit bind, or the main engine while both share one file
+    return current_app.extensions['sqlite_profile'].write_engine('audit')
+
+
+def get_engine_url():
+    try:
+        return get_engine().url.render_as_string(hide_password=False).replace(
+            '%', '%%')
+    except AttributeError:
+        return str(get_engine().url).replace('%', '%%')
+
+
+config.set_main_option('sqlalchemy.url', get_engine_url())
+target_db = current_app.extensions['migrate'].db
+
+
+def get_metadata():
+    return target_db.metadatas['audit']
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    # Only the audit tables; the rest of a shared file is migrations/ territory
+    if type_ == 'table':
+        return name in get_metadata().tables
+    # e.g. security_logs.user_id -> users.id, left over in a shared file
+    if type_ == 'foreign_key_constraint' and reflected:
+        return object.referred_table.name in get_metadata().tables
+    return True
+
+
+def run_migrations_offline():
+    """Run migrations in 'offline' mode."""
+    url = config.get_main_option("sqlalchemy.url")
+    context.configure(
+        url=url, target_metadata=get_metadata(), literal_binds=True,
+        include_object=include_object, version_table=VERSION_TABLE
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    """Run migrations in 'online' mode."""
+
+    def process_revision_directives(context, revision, directives):
+        if getattr(config.cmd_opts, 'autogenerate', False):
+            script = directives[0]
+            if script.upgrade_ops.is_empty():
+                directives[:] = []
+                logger.info('No changes in schema detected.')
+
+    conf_args = dict(current_app.extensions['migrate'].configure_args)
+    if conf_args.get("process_revision_directives") is None:
+        conf_args["process_revision_directives"] = process_revision_directives
+    conf_args["include_object"] = include_object
+    conf_args["version_table"] = VERSION_TABLE
+
+    with get_engine().connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=get_metadata(),
+            **conf_args
+        )
+
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,97 @@
+"""Create audit tables
+
+Revision ID: 5e2a9c7d41b0
+Revises: 
+Create Date: 2026-10-17 11:02:18.406511
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e2a9c7d41b0'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # While the audit bind shares the main file, the main migrations have
+    # already created these tables; only a new audit file needs them
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'login_attempts' not in existing:
+        op.create_table('login_attempts',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('ip_address', sa.String(length=45), nullable=False),
+            sa.Column('user_agent', sa.String(length=500), nullable=True),
+            sa.Column('email', sa.String(length=120), nullable=True),
+            sa.Column('success', sa.Boolean(), nullable=True),
+            sa.Column('timestamp', sa.DateTime(), nullable=True),
+            sa.Column('failure_reason', sa.String(length=100), nullable=True),
+            sa.Column('country', sa.String(length=100), nullable=True),
+            sa.Column('city', sa.String(length=100), nullable=True),
+            sa.Column('latitude', sa.Float(), nullable=True),
+            sa.Column('longitude', sa.Float(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+        with op.batch_alter_table('login_attempts', schema=None) as batch_op:
+            batch_op.create_index('ix_login_attempts_ip_timestamp', ['ip_address', 'timestamp'], unique=False)
+            batch_op.create_index('ix_login_attempts_success_timestamp', ['success', 'timestamp'], unique=False)
+            batch_op.create_index('ix_login_attempts_timestamp', ['timestamp'], unique=False)
+
+    if 'security_logs' not in existing:
+        op.create_table('security_logs',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=True),
+            sa.Column('event_type', sa.String(length=50), nullable=False),
+            sa.Column('ip_address', sa.String(length=45), nullable=True),
+            sa.Column('user_agent', sa.String(length=500), nullable=True),
+            sa.Column('timestamp', sa.DateTime(), nullable=True),
+            sa.Column('details', sa.Text(), nullable=True),
+            sa.Column('severity', sa.String(length=20), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+        with op.batch_alter_table('security_logs', schema=None) as batch_op:
+            batch_op.create_index('ix_security_logs_event_type_timestamp', ['event_type', 'timestamp'], unique=False)
+            batch_op.create_index('ix_security_logs_ip_timestamp', ['ip_address', 'timestamp'], unique=False)
+            batch_op.create_index('ix_security_logs_severity_timestamp', ['severity', 'timestamp'], unique=False)
+            batch_op.create_index('ix_security_logs_timestamp', ['timestamp'], unique=False)
+
+    if 'event_counters' not in existing:
+        op.create_table('event_counters',
+            sa.Column('ip_address', sa.String(length=45), nullable=False),
+            sa.Column('action', sa.String(length=80), nullable=False),
+            sa.Column('bucket', sa.Integer(), nullable=False),
+            sa.Column('count', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('ip_address', 'action', 'bucket')
+        )
+        with op.batch_alter_table('event_counters', schema=None) as batch_op:
+            batch_op.create_index('ix_event_counters_bucket', ['bucket'], unique=False)
+
+    if 'hourly_rollups' not in existing:
+        op.create_table('hourly_rollups',
+            sa.Column('metric', sa.String(length=40), nullable=False),
+            sa.Column('hour', sa.DateTime(), nullable=False),
+            sa.Column('count', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('metric', 'hour')
+        )
+
+    if 'rollup_state' not in existing:
+        op.create_table('rollup_state',
+            sa.Column('source', sa.String(length=50), nullable=False),
+            sa.Column('last_id', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('source')
+        )
+
+
+def downgrade():
+    # Leave shared-file tables to the main migrations
+    if 'users' in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.drop_table('rollup_state')
+    op.drop_table('hourly_rollups')
+    op.drop_table('event_counters')
+    op.drop_table('security_logs')
+    op.drop_table('login_attempts')
@@ -51,6 +51,22 @@ def get_metadata():
     return target_db.metadata
 
 
+def include_object(object, name, type_, reflected, compare_to):
+    # The users_fts full-text index and its shadow tables are managed by hand
+    if type_ == 'table' and name.startswith('users_fts'):
+        return False
+    # Audit tables belong to migrations/audit, even while they share this file
+    if type_ == 'table' and (name in audit_tables() or name == 'alembic_version_audit'):
+        return False
+    return True
+
+
+def audit_tables():
+    if hasattr(target_db, 'metadatas') and 'audit' in target_db.metadatas:
+        return target_db.metadatas['audit'].tables
+    return {}
+
+
 def run_migrations_offline():
     """Run migrations in 'offline' mode.
 
@@ -65,7 +81,8 @@ def run_migrations_offline():
     """
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
-        url=url, target_metadata=get_metadata(), literal_binds=True
+        url=url, target_metadata=get_metadata(), literal_binds=True,
+        include_object=include_object
     )
 
     with context.begin_transaction():
@@ -93,6 +110,7 @@ def run_migrations_online():
     conf_args = current_app.extensions['migrate'].configure_args
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
+    conf_args.setdefault("include_object", include_object)
 
     connectable = get_engine()
 
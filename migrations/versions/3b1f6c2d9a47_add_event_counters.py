@@ -0,0 +1,35 @@
+"""Add event_counters table
+
+Revision ID: 3b1f6c2d9a47
+Revises: 875c76e047f0
+Create Date: 2026-10-17 09:12:40.118230
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b1f6c2d9a47'
+down_revision = '875c76e047f0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('event_counters',
+        sa.Column('ip_address', sa.String(length=45), nullable=False),
+        sa.Column('action', sa.String(length=80), nullable=False),
+        sa.Column('bucket', sa.Integer(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('ip_address', 'action', 'bucket')
+    )
+    with op.batch_alter_table('event_counters', schema=None) as batch_op:
+        batch_op.create_index('ix_event_counters_bucket', ['bucket'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('event_counters', schema=None) as batch_op:
+        batch_op.drop_index('ix_event_counters_bucket')
+
+    op.drop_table('event_counters')
@@ -0,0 +1,49 @@
+"""Add trigram full-text index over users
+
+Revision ID: a7c4e1f08b32
+Revises: 3b1f6c2d9a47
+Create Date: 2026-10-17 11:04:19.532817
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7c4e1f08b32'
+down_revision = '3b1f6c2d9a47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # External-content FTS5 table: it indexes users.username and users.email
+    # without storing a second copy, and the triggers keep it in sync
+    op.execute(
+        "CREATE VIRTUAL TABLE users_fts USING fts5("
+        "username, email, content='users', content_rowid='id', tokenize='trigram')"
+    )
+    op.execute(
+        "CREATE TRIGGER users_fts_insert AFTER INSERT ON users BEGIN "
+        "INSERT INTO users_fts (rowid, username, email) VALUES (new.id, new.username, new.email); "
+        "END"
+    )
+    op.execute(
+        "CREATE TRIGGER users_fts_delete AFTER DELETE ON users BEGIN "
+        "INSERT INTO users_fts (users_fts, rowid, username, email) VALUES ('delete', old.id, old.username, old.email); "
+        "END"
+    )
+    op.execute(
+        "CREATE TRIGGER users_fts_update AFTER UPDATE OF username, email ON users BEGIN "
+        "INSERT INTO users_fts (users_fts, rowid, username, email) VALUES ('delete', old.id, old.username, old.email); "
+        "INSERT INTO users_fts (rowid, username, email) VALUES (new.id, new.username, new.email); "
+        "END"
+    )
+    op.execute("INSERT INTO users_fts (users_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS users_fts_update")
+    op.execute("DROP TRIGGER IF EXISTS users_fts_delete")
+    op.execute("DROP TRIGGER IF EXISTS users_fts_insert")
+    op.execute("DROP TABLE IF EXISTS users_fts")
@@ -1,5 +1,6 @@
 from extensions import db
 from flask_login import UserMixin
+from sqlalchemy import DDL, event
 from datetime import datetime, timezone
 
 
@@ -17,9 +18,36 @@ class User(UserMixin, db.Model):
     def __repr__(self):
         return f'<User {self.username}>'
 
+
+# The users_fts trigram index behind admin user search (see migration a7c4e1f08b32),
+# also created for databases made with db.create_all() instead of migrations
+USERS_FTS_DDL = (
+    "CREATE VIRTUAL TABLE users_fts USING fts5("
+    "username, email, content='users', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER users_fts_insert AFTER INSERT ON users BEGIN "
+    "INSERT INTO users_fts (rowid, username, email) VALUES (new.id, new.username, new.email); "
+    "END",
+    "CREATE TRIGGER users_fts_delete AFTER DELETE ON users BEGIN "
+    "INSERT INTO users_fts (users_fts, rowid, username, email) VALUES ('delete', old.id, old.username, old.email); "
+    "END",
+    "CREATE TRIGGER users_fts_update AFTER UPDATE OF username, email ON users BEGIN "
+    "INSERT INTO users_fts (users_fts, rowid, username, email) VALUES ('delete', old.id, old.username, old.email); "
+    "INSERT INTO users_fts (rowid, username, email) VALUES (new.id, new.username, new.email); "
+    "END",
+)
+for statement in USERS_FTS_DDL:
+    event.listen(User.__table__, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+
 class LoginAttempt(db.Model):
     """Track login attempts for security monitoring"""
     __tablename__ = "login_attempts"
+    __bind_key__ = "audit"
+    # Indexes end in timestamp; SQLite appends the rowid, completing the (timestamp, id) order
+    __table_args__ = (
+        db.Index('ix_login_attempts_timestamp', 'timestamp'),
+        db.Index('ix_login_attempts_ip_timestamp', 'ip_address', 'timestamp'),
+        db.Index('ix_login_attempts_success_timestamp', 'success', 'timestamp'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     ip_address = db.Column(db.String(45), nullable=False)  # IPv6 compatible
@@ -39,9 +67,16 @@ class LoginAttempt(db.Model):
 class SecurityLog(db.Model):
     """Log security-related events"""
     __tablename__ = "security_logs"
+    __bind_key__ = "audit"
+    __table_args__ = (
+        db.Index('ix_security_logs_timestamp', 'timestamp'),
+        db.Index('ix_security_logs_severity_timestamp', 'severity', 'timestamp'),
+        db.Index('ix_security_logs_event_type_timestamp', 'event_type', 'timestamp'),
+        db.Index('ix_security_logs_ip_timestamp', 'ip_address', 'timestamp'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    user_id = db.Column(db.Integer, nullable=True)  # users.id; no foreign key, the audit bind may be another file
     event_type = db.Column(db.String(50), nullable=False)  # login, logout, password_change, etc.
     ip_address = db.Column(db.String(45))
     user_agent = db.Column(db.String(500))
@@ -49,6 +84,34 @@ class SecurityLog(db.Model):
     details = db.Column(db.Text)
     severity = db.Column(db.String(20), default='info')  # info, warning, critical
 
+class EventCounter(db.Model):
+    """Per-IP event counts bucketed by minute, maintained as audit rows are written"""
+    __tablename__ = "event_counters"
+    __bind_key__ = "audit"
+    __table_args__ = (db.Index('ix_event_counters_bucket', 'bucket'),)
+
+    ip_address = db.Column(db.String(45), primary_key=True)
+    action = db.Column(db.String(80), primary_key=True)  # login_attempts or security_logs:<event_type>
+    bucket = db.Column(db.Integer, primary_key=True)  # Unix time // bucket size
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+class HourlyRollup(db.Model):
+    """Hourly counts of login and security events for the dashboard charts"""
+    __tablename__ = "hourly_rollups"
+    __bind_key__ = "audit"
+
+    metric = db.Column(db.String(40), primary_key=True)  # logins, failed_logins, blocked_requests, events:<severity>
+    hour = db.Column(db.DateTime, primary_key=True)  # Naive UTC, truncated to the hour
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+class RollupState(db.Model):
+    """Highest source row id already folded into hourly_rollups"""
+    __tablename__ = "rollup_state"
+    __bind_key__ = "audit"
+
+    source = db.Column(db.String(50), primary_key=True)
+    last_id = db.Column(db.Integer, nullable=False, default=0)
+
 class ContactMessage(db.Model):
     __tablename__ = "contact_messages"
 
@@ -73,6 +136,10 @@ class CareerApplication(db.Model):
 
 class Event(db.Model):
     __tablename__ = "events"
+    __table_args__ = (
+        db.Index('ix_events_date', 'date'),
+        db.Index('ix_events_category_date', 'category', 'date'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(150), nullable=False)
@@ -0,0 +1,176 @@
+# pagination.py
+import math
+from datetime import datetime
+from sqlalchemy import tuple_
+
+
+def encode_cursor(key):
+    """Serialize a key tuple for a query string"""
+    return '~'.join(value.isoformat() if isinstance(value, datetime) else str(value) for value in key)
+
+
+def decode_cursor(cursor, columns):
+    """Parse a cursor back into a key tuple, or None if it doesn't fit columns"""
+    if not cursor:
+        return None
+    parts = cursor.split('~')
+    if len(parts) != len(columns):
+        return None
+    key = []
+    try:
+        for part, column in zip(parts, columns):
+            python_type = column.type.python_type
+            key.append(datetime.fromisoformat(part) if python_type is datetime else python_type(part))
+    except (ValueError, NotImplementedError):
+        return None
+    return tuple(key)
+
+
+class KeysetPage:
+    """One page of a keyset-paginated query
+
+    Offers the same attributes as Flask-SQLAlchemy's ``Pagination`` so the
+    templates can use either. ``url_args(page_num)`` adds the seek cursor
+    for the pages that ``iter_pages()`` lists, so following any of those
+    links is an index seek instead of an OFFSET scan.
+    """
+
+    def __init__(self, items, page, per_page, total, cursors=None, args=None, total_capped=False):
+        self.items = items
+        self.page = page
+        self.per_page = per_page
+        self.total = total
+        self.total_capped = total_capped
+        self.pages = max(1, math.ceil(total / per_page))
+        self.cursors = cursors or {}
+        self.args = {key: value for key, value in (args or {}).items() if value}
+
+    @property
+    def has_prev(self):
+        return self.page > 1
+
+    @property
+    def has_next(self):
+        # A capped total doesn't know the last page, so go on while pages are full
+        return self.page < self.pages or (self.total_capped and len(self.items) == self.per_page)
+
+    @property
+    def prev_num(self):
+        return self.page - 1 if self.has_prev else None
+
+    @property
+    def next_num(self):
+        return self.page + 1 if self.has_next else None
+
+    def url_args(self, page_num):
+        """Query string arguments for a link to page_num, including the filter args"""
+        return {**self.args, 'page': page_num, **self.cursors.get(page_num, {})}
+
+    def iter_pages(self, *, left_edge=1, left_current=2, right_current=3, right_edge=1):
+        """Page numbers to link to, with None where pages are skipped"""
+        pages_end = self.pages + 1
+        left_end = min(1 + left_edge, pages_end)
+        yield from range(1, left_end)
+        if left_end == pages_end:
+            return
+        mid_start = max(left_end, self.page - left_current)
+        mid_end = min(self.page + right_current + 1, pages_end)
+        if mid_start > left_end:
+            yield None
+        yield from range(mid_start, mid_end)
+        if mid_end == pages_end:
+            return
+        right_start = max(mid_end, pages_end - right_edge)
+        if right_start > mid_end:
+            yield None
+        yield from range(right_start, pages_end)
+
+
+class Keyset:
+    """Seek pagination over a query ordered by unique key columns
+
+    Pages are fetched with ``WHERE key > :last ORDER BY key LIMIT n`` (or
+    the mirror image for going backwards), so the cost of a page doesn't
+    grow with how deep into the table it is. The first and last pages need
+    no cursor. A page number arriving without a cursor, such as a bookmark,
+    falls back to OFFSET.
+
+    ``key`` reads the key tuple from a result row and defaults to the
+    attributes named like the key columns.
+    """
+
+    def __init__(self, query, columns, descending=False, key=None):
+        self.query = query
+        self.columns = list(columns)
+        self.descending = descending
+        self.key = key or (lambda row: tuple(getattr(row, column.key) for column in self.columns))
+
+    def paginate(self, page=1, per_page=25, after=None, before=None, total=None, args=None, count_limit=None):
+        """Fetch a KeysetPage; after/before are cursors from KeysetPage.url_args
+
+        ``args`` are extra query string arguments, such as filters, that
+        every page link should keep. With ``count_limit`` the total stops
+        counting at that many rows and the page is marked ``total_capped``.
+        """
+        capped = False
+        if total is None:
+            query = self.query.order_by(None)
+            if count_limit is not None:
+                total = query.limit(count_limit + 1).count()
+                capped = total > count_limit
+                total = min(total, count_limit)
+            else:
+                total = query.count()
+        pages = max(1, math.ceil(total / per_page))
+        page = max(page, 1) if capped else min(max(page, 1), pages)
+        after = decode_cursor(after, self.columns)
+        before = decode_cursor(before, self.columns)
+
+        if after is not None:
+            items = self._ordered(self._seek(self.query, after, forward=True)).limit(per_page).all()
+        elif before is not None:
+            items = self._ordered(self._seek(self.query, before, forward=False), reverse=True).limit(per_page).all()[::-1]
+        elif page == 1:
+            items = self._ordered(self.query).limit(per_page).all()
+        elif page == pages and not capped:
+            items = self._ordered(self.query, reverse=True).limit(total - (pages - 1) * per_page).all()[::-1]
+        else:
+            items = self._ordered(self.query).offset((page - 1) * per_page).limit(per_page).all()
+
+        result = KeysetPage(items, page, per_page, total, args=args, total_capped=capped)
+        if items:
+            first, last = self.key(items[0]), self.key(items[-1])
+            for page_num in result.iter_pages():
+                if page_num is None or page_num in (1, page) or (page_num == pages and not capped):
+                    continue
+                if page_num > page:
+                    key = self._boundary(last, (page_num - page - 1) * per_page, forward=True)
+                    if key is not None:
+                        result.cursors[page_num] = {'after': encode_cursor(key)}
+                else:
+                    key = self._boundary(first, (page - page_num - 1) * per_page, forward=False)
+                    if key is not None:
+                        result.cursors[page_num] = {'before': encode_cursor(key)}
+            if result.has_next and page + 1 not in result.cursors:
+                result.cursors[page + 1] = {'after': encode_cursor(last)}
+        return result
+
+    def _boundary(self, key, skip, forward):
+        """Key of the row skip rows beyond key, which becomes the cursor for that page"""
+        if skip == 0:
+            return key
+        query = self._seek(self.query, key, forward).with_entities(*self.columns)
+        row = self._ordered(query, reverse=not forward).offset(skip - 1).limit(1).first()
+        return tuple(row) if row is not None else None
+
+    def _seek(self, query, key, forward):
+        later = forward != self.descending
+        if len(self.columns) == 1:
+            column, value = self.columns[0], key[0]
+            return query.filter(column > value if later else column < value)
+        columns, values = tuple_(*self.columns), tuple_(*key)
+        return query.filter(columns > values if later else columns < values)
+
+    def _ordered(self, query, reverse=False):
+        descending = self.descending != reverse
+        return query.order_by(None).order_by(*(column.desc() if descending else column.asc() for column in self.columns))
@@ -5,7 +5,7 @@ Script to reset a user's password in the Aura database
 
 import sqlite3
 import os
-from werkzeug.security import generate_password_hash
+from extensions import password_hasher
 
 def reset_user_password(email, new_password):
     """Reset a user's password in the database"""
@@ -17,6 +17,9 @@ def reset_user_password(email, new_password):
         print(f"❌ Database not found at {db_path}")
         return False
     
+    # Hash with the method picked by calibrate_hashing.py, if it has been run
+    password_hasher.use_calibration('instance')
+    
     try:
         # Connect to database
         conn = sqlite3.connect(db_path)
@@ -37,7 +40,7 @@ def reset_user_password(email, new_password):
         print(f"✅ Found user: {username} (ID: {user_id})")
         
         # Generate new password hash
-        new_password_hash = generate_password_hash(new_password, method='pbkdf2:sha256:600000')
+        new_password_hash = password_hasher.hash(new_password)
         
         # Update password in database
         cursor.execute("""
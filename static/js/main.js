@@ -6,6 +6,7 @@ document.addEventListener('DOMContentLoaded', function() {
     initScrollEffects();
     initHoverEffects();
     initNavbarEffects();
+    loadAuthNav();
     
     // Smooth scrolling for anchor links
     document.querySelectorAll('a[href^="#"]').forEach(anchor => {
@@ -22,6 +23,20 @@ document.addEventListener('DOMContentLoaded', function() {
     });
 });
 
+// Statically exported pages are rendered logged out; swap in the visitor's navbar items
+function loadAuthNav() {
+    const nav = document.querySelector('[data-auth-nav]');
+    if (!nav) return;
+    fetch(nav.dataset.authNav, { credentials: 'same-origin', headers: { 'X-Requested-With': 'fetch' } })
+        .then(response => response.ok ? response.text() : null)
+        .then(html => {
+            if (html === null) return;
+            nav.querySelectorAll('[data-auth-item]').forEach(item => item.remove());
+            nav.insertAdjacentHTML('beforeend', html);
+        })
+        .catch(() => {});
+}
+
 // Initialize animations
 function initAnimations() {
     // Add loading animation to cards
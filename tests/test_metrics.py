@@ -0,0 +1,33 @@
+import config
+from app import create_app
+from extensions import db, rate_limiter, request_metrics
+
+
+def test_rate_limited_requests_are_counted(tmp_path):
+    settings = {
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'aura.db'}",
+        'RATE_LIMIT_FILE': str(tmp_path / 'ratelimit.bin'),
+        'RATE_LIMITS': {'auth.login': '5 per minute'},
+        'METRICS_DIR': str(tmp_path / 'metrics'),
+        'JINJA_BYTECODE_CACHE': None,
+    }
+    config.config['metrics_test'] = type('MetricsTestConfig', (config.TestingConfig,), settings)
+    app = create_app('metrics_test')
+    with app.app_context():
+        db.create_all()
+
+    client = app.test_client()
+    statuses = [
+        client.post('/auth/login', data={'email': 'nobody@example.com', 'password': 'wrong'}).status_code
+        for _ in range(8)
+    ]
+    try:
+        assert statuses == [200] * 5 + [429] * 3
+        series, _ = request_metrics.collect()
+        assert series[('auth.login', 429)][0] == 3
+        assert 'aura_requests_total{endpoint="auth.login",status="429"} 3' in request_metrics.render()
+    finally:
+        request_metrics.reset()
+        rate_limiter.close()
+        with app.app_context():
+            db.engine.dispose()
@@ -0,0 +1 @@
+# Web delivery package: static assets, images, page and template caching, static export
@@ -0,0 +1,161 @@
+import os
+import gzip
+import json
+import hashlib
+import mimetypes
+from flask import current_app, request, send_from_directory
+
+try:
+    import brotli
+except ImportError:  # .br siblings are skipped; gzip is always written
+    brotli = None
+
+
+MANIFEST = 'manifest.json'
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+# Already-compressed formats gain nothing from gzip or brotli
+COMPRESSIBLE = {'.css', '.js', '.mjs', '.map', '.svg', '.json', '.txt', '.html', '.xml', '.ico', '.ttf', '.otf', '.eot'}
+MIN_COMPRESS_BYTES = 256
+
+
+def _fingerprinted(relative, digest):
+    stem, ext = os.path.splitext(relative)
+    return f'{stem}.{digest}{ext}'
+
+
+class StaticAssets:
+    """Content-hashed static files with precompressed siblings and immutable caching
+
+    ``build()`` copies every file under the static folder to
+    ``ASSET_DIR/<name>.<hash><ext>``, writes ``.gz`` (and ``.br`` when the
+    brotli package is installed) next to the ones worth compressing, and
+    records ``name -> hashed name`` in ``ASSET_DIR/manifest.json``. Earlier
+    builds are left in place so pages rendered before a deploy keep working.
+
+    At runtime, ``url_for('static', filename=...)`` is rewritten through the
+    manifest, and the static view serves hashed files with a one-year
+    immutable Cache-Control, choosing the ``.br``/``.gz`` sibling the client
+    accepts. Anything not in the manifest is served by Flask as before.
+    """
+
+    def __init__(self, app=None, asset_dir='dist'):
+        self.asset_dir = asset_dir
+        self.static_folder = None
+        self.manifest = {}
+        self.hashed = set()
+        self.enabled = True
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Load the manifest and take over URL building and serving for the static endpoint"""
+        self.asset_dir = app.config.get('ASSET_DIR', self.asset_dir).strip('/')
+        self.static_folder = app.static_folder
+        enabled = app.config.get('ASSET_FINGERPRINTS')
+        self.enabled = not app.debug if enabled is None else enabled
+        self.load()
+
+        if self.enabled and app.static_folder:
+            app.url_defaults(self._url_defaults)
+            app.view_functions['static'] = self.send_static
+        app.extensions['static_assets'] = self
+
+    def load(self):
+        """Read the manifest written by the last build, if any"""
+        try:
+            with open(os.path.join(self.static_folder, self.asset_dir, MANIFEST)) as f:
+                self.manifest = json.load(f)
+        except (OSError, ValueError, TypeError):
+            self.manifest = {}
+        self.hashed = set(self.manifest.values())
+
+    def url(self, filename):
+        """Hashed path for a static filename, or the filename itself if it wasn't built"""
+        return self.manifest.get(filename, filename)
+
+    def _url_defaults(self, endpoint, values):
+        if endpoint == 'static' and 'filename' in values:
+            values['filename'] = self.url(values['filename'])
+
+    def send_static(self, filename):
+        """Static view: precompressed, immutable responses for hashed files"""
+        if filename not in self.hashed:
+            return current_app.send_static_file(filename)
+
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        accepted = request.accept_encodings
+        response = None
+        for encoding, suffix in (('br', '.br'), ('gzip', '.gz')):
+            if accepted[encoding] and os.path.isfile(os.path.join(self.static_folder, filename + suffix)):
+                response = send_from_directory(self.static_folder, filename + suffix, mimetype=mimetype, max_age=None)
+                response.headers['Content-Encoding'] = encoding
+                break
+        if response is None:
+            response = send_from_directory(self.static_folder, filename, mimetype=mimetype, max_age=None)
+        response.headers['Cache-Control'] = IMMUTABLE
+        response.vary.add('Accept-Encoding')
+        return response
+
+    def build(self, prune=False):
+        """Fingerprint and compress every static file; returns (files, bytes, compressed bytes)
+
+        With ``prune``, hashed files from earlier builds that the new
+        manifest doesn't reference are deleted.
+        """
+        output = os.path.join(self.static_folder, self.asset_dir)
+        manifest, written = {}, set()
+        files = original_bytes = compressed_bytes = 0
+        for directory, subdirs, names in os.walk(self.static_folder):
+            if os.path.realpath(directory) == os.path.realpath(self.static_folder):
+                subdirs[:] = [name for name in subdirs if name != self.asset_dir.split('/')[0]]
+            for name in names:
+                if name.endswith(('.gz', '.br', '.tmp')):
+                    continue
+                path = os.path.join(directory, name)
+                relative = os.path.relpath(path, self.static_folder).replace(os.sep, '/')
+                with open(path, 'rb') as f:
+                    data = f.read()
+                target = f'{self.asset_dir}/{_fingerprinted(relative, hashlib.sha256(data).hexdigest()[:10])}'
+                manifest[relative] = target
+                target_path = os.path.join(self.static_folder, target)
+                written.update({target_path, target_path + '.gz', target_path + '.br'})
+                files += 1
+                original_bytes += len(data)
+                compressed_bytes += self._write(target_path, data)
+
+        os.makedirs(output, exist_ok=True)
+        with open(os.path.join(output, MANIFEST + '.tmp'), 'w') as f:
+            json.dump(manifest, f, indent=1, sort_keys=True)
+        os.replace(os.path.join(output, MANIFEST + '.tmp'), os.path.join(output, MANIFEST))
+
+        if prune:
+            for directory, _, names in os.walk(output):
+                for name in names:
+                    path = os.path.join(directory, name)
+                    if name != MANIFEST and path not in written:
+                        os.remove(path)
+        self.manifest = manifest
+        self.hashed = set(manifest.values())
+        return files, original_bytes, compressed_bytes
+
+    def _write(self, target_path, data):
+        """Write a hashed file and its compressed siblings; returns the smallest size a client gets"""
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        smallest = len(data)
+        variants = [(target_path, data)]
+        if os.path.splitext(target_path)[1].lower() in COMPRESSIBLE and len(data) >= MIN_COMPRESS_BYTES:
+            variants.append((target_path + '.gz', gzip.compress(data, compresslevel=9, mtime=0)))
+            if brotli is not None:
+                variants.append((target_path + '.br', brotli.compress(data, quality=11)))
+        for path, content in variants:
+            if path != target_path and len(content) >= len(data):
+                continue
+            smallest = min(smallest, len(content))
+            # Same name means same content, so an existing file is already right
+            if not os.path.exists(path):
+                with open(path + '.tmp', 'wb') as f:
+                    f.write(content)
+                os.replace(path + '.tmp', path)
+        return smallest
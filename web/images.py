@@ -0,0 +1,236 @@
+import io
+import os
+import json
+import hashlib
+import threading
+from flask import url_for
+from markupsafe import Markup, escape
+
+DEFAULT_WIDTHS = (320, 640, 960, 1280, 1920)
+RASTER_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp', '.gif'}
+
+# Pillow format and MIME type for the non-WebP fallback of each source type
+_FALLBACKS = {
+    '.jpg': ('JPEG', 'image/jpeg', '.jpg'),
+    '.jpeg': ('JPEG', 'image/jpeg', '.jpg'),
+    '.png': ('PNG', 'image/png', '.png'),
+    '.gif': ('PNG', 'image/png', '.png'),
+    '.webp': ('PNG', 'image/png', '.png'),
+}
+
+
+def _pillow():
+    """Pillow's Image and ImageOps, imported on first use since only builds need them"""
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:  # Pages fall back to the original image without variants
+        return None, None
+    return Image, ImageOps
+
+
+def _attributes(attrs):
+    return ''.join(
+        f' {name.rstrip("_").replace("_", "-")}="{escape(value)}"'
+        for name, value in attrs.items() if value is not None
+    )
+
+
+class ImagePipeline:
+    """Resized and WebP variants of raster images, named by content hash
+
+    ``generate`` writes each source image under the static folder at every
+    configured width no larger than the original, once as WebP and once in
+    the source's own format, to ``IMAGE_VARIANT_DIR``. Variant names carry
+    a hash of the source bytes, so they never go stale and can be cached
+    forever, and a sidecar JSON file lists them with the intrinsic size.
+    Variants are built on upload (``save_upload``) or ahead of time with
+    ``build_images.py``, never while rendering a page.
+
+    The ``responsive_image`` template global emits a ``<picture>`` with
+    ``srcset``s for whatever variants exist, or a plain ``<img>`` for SVGs
+    and images that haven't been built yet. Pillow is only needed to build.
+    """
+
+    def __init__(self, app=None, widths=DEFAULT_WIDTHS, quality=80):
+        self.widths = widths
+        self.quality = quality
+        self.static_folder = None
+        self.variant_dir = 'img/variants'
+        self.upload_dir = 'uploads'
+        self._entries = {}
+        self._lock = threading.Lock()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Read widths, quality and directories from app config and register the template global"""
+        self.widths = tuple(sorted(app.config.get('IMAGE_WIDTHS', self.widths)))
+        self.quality = app.config.get('IMAGE_QUALITY', self.quality)
+        self.variant_dir = app.config.get('IMAGE_VARIANT_DIR', self.variant_dir).strip('/')
+        self.upload_dir = app.config.get('IMAGE_UPLOAD_DIR', self.upload_dir).strip('/')
+        self.static_folder = app.static_folder
+        app.add_template_global(self.responsive_image, 'responsive_image')
+        app.extensions['image_pipeline'] = self
+
+    @staticmethod
+    def normalize(source):
+        """Path relative to the static folder, accepting '/static/...' forms too"""
+        source = (source or '').strip().lstrip('/')
+        return source[len('static/'):] if source.startswith('static/') else source
+
+    def is_raster(self, source):
+        return os.path.splitext(source)[1].lower() in RASTER_EXTENSIONS
+
+    def _path(self, relative):
+        path = os.path.realpath(os.path.join(self.static_folder, relative))
+        if not path.startswith(os.path.realpath(self.static_folder) + os.sep):
+            raise ValueError(f"Image '{relative}' is outside the static folder.")
+        return path
+
+    def _digest(self, path):
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                sha.update(chunk)
+        return sha.hexdigest()[:12]
+
+    def _sidecar(self, source, digest):
+        stem = os.path.splitext(os.path.basename(source))[0]
+        return f'{self.variant_dir}/{stem}-{digest}.json', f'{self.variant_dir}/{stem}-{digest}'
+
+    def lookup(self, source):
+        """Sidecar entry for a built image, or None; cached per process by file mtime and size"""
+        source = self.normalize(source)
+        if not source or not self.is_raster(source):
+            return None
+        try:
+            path = self._path(source)
+            stat = os.stat(path)
+        except (OSError, ValueError):
+            return None
+        version = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._entries.get(source)
+        if cached is not None and cached[0] == version:
+            digest, entry = cached[1], cached[2]
+            if entry is not None:
+                return entry
+        else:
+            digest = self._digest(path)
+
+        # Unbuilt images keep their digest, so checking again for a build is one open()
+        entry = None
+        sidecar, _ = self._sidecar(source, digest)
+        try:
+            with open(self._path(sidecar)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            pass
+        with self._lock:
+            self._entries[source] = (version, digest, entry)
+        return entry
+
+    def generate(self, source, force=False):
+        """Write the variants and sidecar for one image; returns the sidecar entry"""
+        Image, ImageOps = _pillow()
+        if Image is None:
+            raise RuntimeError("Pillow is required to build image variants (pip install Pillow).")
+        source = self.normalize(source)
+        path = self._path(source)
+        digest = self._digest(path)
+        sidecar, prefix = self._sidecar(source, digest)
+        sidecar_path = self._path(sidecar)
+        if not force and os.path.exists(sidecar_path):
+            with open(sidecar_path) as f:
+                return json.load(f)
+
+        fallback_format, fallback_type, fallback_ext = _FALLBACKS[os.path.splitext(source)[1].lower()]
+        os.makedirs(os.path.dirname(sidecar_path), exist_ok=True)
+        variants = []
+        with Image.open(path) as original:
+            image = ImageOps.exif_transpose(original)
+            width, height = image.size
+            if fallback_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+                image = image.convert('RGB')
+            elif image.mode not in ('RGB', 'RGBA', 'L', 'LA'):
+                image = image.convert('RGBA')
+            # Widths below the source, plus the source itself capped at the largest width
+            widths = sorted({*(w for w in self.widths if w < width), min(width, self.widths[-1])})
+            for target in widths:
+                resized = image if target == width else image.resize(
+                    (target, max(1, round(height * target / width))), Image.LANCZOS
+                )
+                for image_format, mime, ext in (('WEBP', 'image/webp', '.webp'), (fallback_format, fallback_type, fallback_ext)):
+                    name = f'{prefix}-{target}w{ext}'
+                    options = {'quality': self.quality, 'method': 6} if image_format == 'WEBP' else {'optimize': True}
+                    if image_format == 'JPEG':
+                        options.update(quality=self.quality, progressive=True)
+                    resized.save(self._path(name) + '.tmp', image_format, **options)
+                    os.replace(self._path(name) + '.tmp', self._path(name))
+                    variants.append({'file': name, 'width': target, 'type': mime})
+
+        entry = {'source': source, 'hash': digest, 'width': width, 'height': height, 'variants': variants}
+        with open(sidecar_path + '.tmp', 'w') as f:
+            json.dump(entry, f, indent=1)
+        os.replace(sidecar_path + '.tmp', sidecar_path)
+        return entry
+
+    def save_upload(self, storage):
+        """Store an uploaded image under IMAGE_UPLOAD_DIR by content hash and build its variants
+
+        Returns the path to keep in e.g. ``Event.image``. Raises ValueError
+        for files that aren't a supported image.
+        """
+        Image, _ = _pillow()
+        if Image is None:
+            raise RuntimeError("Pillow is required to accept image uploads (pip install Pillow).")
+        ext = os.path.splitext(storage.filename or '')[1].lower()
+        if ext not in RASTER_EXTENSIONS:
+            raise ValueError("Unsupported image type.")
+        data = storage.read()
+        try:
+            with Image.open(io.BytesIO(data)) as image:
+                image.verify()
+        except Exception as e:
+            raise ValueError("Uploaded file is not a valid image.") from e
+
+        source = f'{self.upload_dir}/{hashlib.sha256(data).hexdigest()[:16]}{".jpg" if ext == ".jpeg" else ext}'
+        path = self._path(source)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path + '.tmp', 'wb') as f:
+                f.write(data)
+            os.replace(path + '.tmp', path)
+        self.generate(source)
+        return source
+
+    def responsive_image(self, source, alt='', sizes='100vw', fallback_width=960, **attrs):
+        """<picture> markup with WebP and fallback srcsets, or a plain <img> if there are no variants
+
+        Extra keyword arguments become attributes of the ``<img>``; use
+        ``class_`` for ``class``. Images load lazily unless ``loading`` is given.
+        """
+        attrs.setdefault('loading', 'lazy')
+        attrs.setdefault('decoding', 'async')
+        entry = self.lookup(source)
+        if entry is None:
+            src = url_for('static', filename=self.normalize(source))
+            return Markup(f'<img src="{escape(src)}" alt="{escape(alt)}"{_attributes(attrs)}>')
+
+        by_type = {}
+        for variant in entry['variants']:
+            by_type.setdefault(variant['type'], []).append(variant)
+        fallback_type = next(mime for mime in by_type if mime != 'image/webp')
+        fallback = by_type[fallback_type]
+        src = max((v for v in fallback if v['width'] <= fallback_width), key=lambda v: v['width'], default=fallback[0])
+
+        def srcset(variants):
+            return ', '.join(f"{url_for('static', filename=v['file'])} {v['width']}w" for v in variants)
+
+        return Markup(
+            f'<picture><source type="image/webp" srcset="{escape(srcset(by_type["image/webp"]))}" sizes="{escape(sizes)}">'
+            f'<img src="{escape(url_for("static", filename=src["file"]))}" srcset="{escape(srcset(fallback))}" '
+            f'sizes="{escape(sizes)}" width="{entry["width"]}" height="{entry["height"]}" alt="{escape(alt)}"'
+            f'{_attributes(attrs)}></picture>'
+        )
@@ -0,0 +1,135 @@
+import os
+import time
+import hashlib
+import threading
+from functools import wraps
+from collections import OrderedDict
+from flask import current_app, request, session, make_response
+from flask_login import current_user
+
+
+class PageCache:
+    """Per-process cache of rendered pages for views whose output never changes
+
+    ``@page_cache.cached`` stores a view's response body under its endpoint,
+    view arguments, the visitor's login state (the navbar shows the username
+    and admin link) and a version of the template files. Hits skip Jinja
+    entirely and carry a strong ETag, so a revalidating browser gets a 304
+    with no body. The query string is ignored, which keeps campaign links
+    with tracking parameters on the cached copy.
+
+    The template version is a hash of every template's name, size and mtime,
+    rechecked at most every ``PAGE_CACHE_CHECK_INTERVAL`` seconds, so an
+    edited template or a deploy that ships new ones invalidates everything.
+    ``PAGE_CACHE_VERSION`` (e.g. the release id) is folded in as well.
+    """
+
+    def __init__(self, app=None, max_size=256, check_interval=5):
+        self.max_size = max_size
+        self.check_interval = check_interval
+        self.release = ''
+        self.enabled = True
+        self.template_dirs = []
+        self._version = None
+        self._checked = 0.0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'not_modified': 0, 'evictions': 0}
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Configure size, release and template folders from app config"""
+        self.max_size = app.config.get('PAGE_CACHE_SIZE', self.max_size)
+        self.check_interval = app.config.get('PAGE_CACHE_CHECK_INTERVAL', self.check_interval)
+        self.release = str(app.config.get('PAGE_CACHE_VERSION') or '')
+        enabled = app.config.get('PAGE_CACHE_ENABLED')
+        self.enabled = not app.debug if enabled is None else enabled
+        self.template_dirs = [os.path.join(app.root_path, app.template_folder)] if app.template_folder else []
+        app.extensions['page_cache'] = self
+
+    def cached(self, view):
+        """Decorator for GET views that render the same page for every visitor in the same login state"""
+        @wraps(view)
+        def decorated(*args, **kwargs):
+            # A pending flash message must reach a real render
+            if not self.enabled or request.method not in ('GET', 'HEAD') or '_flashes' in session:
+                return view(*args, **kwargs)
+
+            key = (request.endpoint, tuple(sorted(kwargs.items())), self._visitor(), self.version())
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    self._stats['hits'] += 1
+                else:
+                    self._stats['misses'] += 1
+
+            if entry is None:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200 or response.direct_passthrough:
+                    return response
+                body = response.get_data()
+                entry = (body, hashlib.sha256(body).hexdigest()[:32], response.mimetype)
+                with self._lock:
+                    self._entries[key] = entry
+                    while len(self._entries) > self.max_size:
+                        self._entries.popitem(last=False)
+                        self._stats['evictions'] += 1
+            else:
+                response = current_app.response_class(entry[0], mimetype=entry[2])
+
+            response.set_etag(entry[1])
+            # Browsers revalidate every time, since logging in or out changes the page
+            response.cache_control.no_cache = True
+            response.cache_control.private = True
+            response.vary.add('Cookie')
+            response.make_conditional(request)
+            if response.status_code == 304:
+                with self._lock:
+                    self._stats['not_modified'] += 1
+            return response
+        return decorated
+
+    def _visitor(self):
+        if not current_user.is_authenticated:
+            return None
+        return (current_user.get_id(), current_user.username, bool(current_user.is_admin))
+
+    def version(self):
+        """Hash of the template files and release, recomputed at most every check_interval seconds"""
+        now = time.monotonic()
+        if self._version is not None and now - self._checked < self.check_interval:
+            return self._version
+        digest = hashlib.sha256(self.release.encode())
+        for directory in self.template_dirs:
+            for root, subdirs, names in os.walk(directory):
+                subdirs.sort()
+                for name in sorted(names):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    digest.update(f'{os.path.relpath(path, directory)}:{stat.st_size}:{stat.st_mtime_ns};'.encode())
+        version = digest.hexdigest()[:16]
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+            self._version, self._checked = version, now
+        return version
+
+    def clear(self):
+        """Drop every cached page"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Return a snapshot of the cache counters"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._entries)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
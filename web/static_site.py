@@ -0,0 +1,135 @@
+import os
+import shutil
+import click
+
+
+DEFAULT_BLUEPRINTS = ('main', 'events')
+# Pages that depend on the query string or only exist for exported pages
+DEFAULT_SKIP = ('main.events', 'main.navbar_auth')
+EXPORT_ENVIRON = 'aura.static_export'
+
+
+def output_name(path):
+    """File for a URL path: '/' -> index.html, '/a/' -> a/index.html, '/a/b' -> a/b.html"""
+    if path.endswith('/'):
+        return f"{path.strip('/')}/index.html".lstrip('/')
+    return f"{path.strip('/')}.html"
+
+
+def _event_ids():
+    from extensions import db
+    from models import Event
+
+    return [{'event_id': event_id} for event_id, in db.session.query(Event.id).order_by(Event.id)]
+
+
+class StaticSite:
+    """Renders the public pages to HTML files a front proxy can serve without Python
+
+    ``flask export-static`` requests every GET-only route of the exported
+    blueprints through the test client as a logged-out visitor and writes
+    each 200 HTML response under ``STATIC_EXPORT_DIR``, with ``static/``
+    copied alongside. Only blueprints create_app registers are exported, so
+    every file matches a page the live app serves. Routes with URL arguments
+    are exported for the values listed in ``url_values`` (every event id for
+    ``events.event_detail``).
+    Exported pages mark the navbar with ``data-auth-nav``; main.js then
+    fetches ``main.navbar_auth`` from the app and swaps in the visitor's
+    login state, so that one small request is all that reaches gunicorn.
+
+    A proxy serves the tree with e.g. nginx's
+    ``try_files $uri $uri.html $uri/index.html @app``, passing POSTs, /auth,
+    /admin and /navbar-auth to the app.
+    """
+
+    def __init__(self, app=None, blueprints=DEFAULT_BLUEPRINTS, skip=DEFAULT_SKIP):
+        self.blueprints = blueprints
+        self.skip = skip
+        self.output_dir = None
+        self.url_values = {'events.event_detail': _event_ids}
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Read the export settings and register the ``export-static`` command"""
+        self.blueprints = tuple(app.config.get('STATIC_EXPORT_BLUEPRINTS', self.blueprints))
+        self.skip = tuple(app.config.get('STATIC_EXPORT_SKIP', self.skip))
+        self.output_dir = (
+            app.config.get('STATIC_EXPORT_DIR') or os.path.join(app.instance_path, 'site')
+        )
+        app.extensions['static_site'] = self
+
+        @app.cli.command('export-static')
+        @click.option('--output', type=click.Path(file_okay=False),
+                      help='Directory to write (default: STATIC_EXPORT_DIR)')
+        @click.option('--no-static', is_flag=True,
+                      help="Don't copy the static folder into the export")
+        def export_static(output, no_static):
+            """Render the public pages to HTML files for direct serving."""
+            from flask import current_app
+
+            written, skipped = self.export(current_app, output, copy_static=not no_static)
+            for path, reason in skipped:
+                click.echo(f"   ⏭️  {path} ({reason})")
+            click.echo(f"✅ {len(written)} pages written to {output or self.output_dir}")
+
+    def routes(self, app):
+        """(endpoint, URL values) for every exportable GET route"""
+        for rule in sorted(app.url_map.iter_rules(), key=lambda rule: rule.rule):
+            blueprint = rule.endpoint.rpartition('.')[0]
+            if blueprint not in self.blueprints or rule.endpoint in self.skip:
+                continue
+            if rule.methods - {'GET', 'HEAD', 'OPTIONS'}:
+                continue
+            if not rule.arguments:
+                yield rule.endpoint, {}
+            elif rule.endpoint in self.url_values:
+                for values in self.url_values[rule.endpoint]():
+                    yield rule.endpoint, values
+
+    def export(self, app, output=None, copy_static=True):
+        """Write the pages into output, swapping it in whole
+
+        Returns the paths written and a list of (path, reason) for pages
+        skipped. The page cache is off while rendering and restored after.
+        """
+        from flask import url_for
+        from extensions import page_cache
+
+        output = os.path.abspath(output or self.output_dir)
+        building = output + '.tmp'
+        shutil.rmtree(building, ignore_errors=True)
+        os.makedirs(building)
+
+        with app.app_context():
+            with app.test_request_context():
+                targets = [url_for(endpoint, **values) for endpoint, values in self.routes(app)]
+
+        written, skipped = [], []
+        client = app.test_client()
+        cache_enabled, page_cache.enabled = page_cache.enabled, False
+        try:
+            for path in targets:
+                response = client.get(path, environ_base={EXPORT_ENVIRON: True})
+                if response.status_code != 200 or response.mimetype != 'text/html':
+                    skipped.append((path, f'{response.status_code} {response.mimetype}'))
+                    continue
+                target = os.path.join(building, output_name(path))
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                with open(target, 'wb') as f:
+                    f.write(response.get_data())
+                written.append(path)
+        finally:
+            page_cache.enabled = cache_enabled
+
+        if copy_static and app.static_folder:
+            shutil.copytree(app.static_folder, os.path.join(building, 'static'))
+
+        previous = output + '.old'
+        shutil.rmtree(previous, ignore_errors=True)
+        if os.path.exists(output):
+            os.rename(output, previous)
+        os.rename(building, output)
+        shutil.rmtree(previous, ignore_errors=True)
+        return written, skipped
@@ -0,0 +1,59 @@
+import os
+import click
+from jinja2 import FileSystemBytecodeCache
+
+
+class TemplateCache:
+    """Persistent Jinja bytecode cache shared by every worker
+
+    Jinja compiles each template to Python the first time a process renders
+    it, which the marketing pages, base.html and navbar.html pay again in
+    every new gunicorn worker. With ``JINJA_BYTECODE_CACHE`` set, compiled
+    templates are marshalled to that directory and new workers only load
+    them. ``flask precompile-templates`` fills the cache at deploy time.
+    Entries are keyed by template source checksum, so an edited template is
+    recompiled rather than served stale.
+
+    ``JINJA_PRELOAD_TEMPLATES`` also loads every template at startup, so a
+    worker's first request renders without touching the cache or loader.
+    """
+
+    def __init__(self, app=None):
+        self.directory = None
+        self.bytecode_cache = None
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Attach the bytecode cache to the app's Jinja environment and register the command"""
+        directory = app.config.get('JINJA_BYTECODE_CACHE')
+        if directory:
+            self.directory = directory if os.path.isabs(directory) else os.path.join(app.instance_path, directory)
+            os.makedirs(self.directory, exist_ok=True)
+            self.bytecode_cache = FileSystemBytecodeCache(self.directory)
+            app.jinja_env.bytecode_cache = self.bytecode_cache
+        if app.config.get('JINJA_PRELOAD_TEMPLATES'):
+            self.load_all(app)
+        app.extensions['template_cache'] = self
+
+        @app.cli.command('precompile-templates')
+        @click.option('--clear', is_flag=True, help='Drop cached bytecode first')
+        def precompile_templates(clear):
+            """Compile every template into the Jinja bytecode cache."""
+            from flask import current_app
+
+            if self.bytecode_cache is None:
+                raise click.ClickException('JINJA_BYTECODE_CACHE is not set.')
+            if clear:
+                self.bytecode_cache.clear()
+            count = self.load_all(current_app)
+            click.echo(f"✅ {count} templates compiled into {self.directory}")
+
+    def load_all(self, app):
+        """Load (compiling if needed) every template the app can find; returns how many"""
+        env = app.jinja_env
+        names = env.list_templates(filter_func=lambda name: name.endswith(('.html', '.txt', '.xml')))
+        for name in names:
+            env.get_template(name)
+        return len(names)
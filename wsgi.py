@@ -1,3 +1,5 @@
+import os
 from app import create_app
 
-app = create_app()
+# The WSGI entry point is what gunicorn serves, so it defaults to production
+app = create_app(os.environ.get('FLASK_CONFIG', 'production'))